@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+
+from skyfield import almanac
+from skyfield.constants import tau
+
+from _calendar import listDates
+from _constants import *
+from _ephemeris import StackedEphemeris
+from _nutation import applyNutation
+from _positions import PositionCache
+from _riseset import altitudeOf, findRiseSet
+from _riseset import SUN_LEVELS, MOON_HORIZON, moonLimbCorrection
+from _sites import locations
+from _utils import utcDayOfYear
+from save_calculations import cached
+
+import numpy as np
+
+
+# The calculations kept in calculations-cache for the tables and monthgen,
+# done and cached by month: calculateXXX(year) gives the columns of all days
+# of a year, as used by the tables, and calculateXXX(year, [month]) those of
+# the days of one month only, computing no more than that month when
+# nothing is cached, e.g. for rendering a single page with monthgen.
+#
+# Months missing from the cache are searched together, over the span from
+# the first to the last of them.
+
+MONTHS = list(range(1, 13))
+
+LATITUDES = [calcLat for calcLat, _ in locations]
+
+SOLARTERMS = "春分 清明 谷雨 立夏 小满 芒种 夏至 小暑 大暑 立秋 处暑 白露 秋分 寒露 霜降 立冬 小雪 大雪 冬至 小寒 大寒 立春 雨水 惊蛰".split(" ")
+
+PLANETS = {
+    "Mercury": Mercury,
+    "Venus":   Venus,
+    "Mars":    Mars,
+    "Jupiter": Jupiter,
+    "Saturn":  Saturn,
+    "Uranus":  Uranus,
+    "Neptune": Neptune,
+}
+
+
+def _span(year, months):
+    # from the first moment of the first month to the last second of the
+    # last one
+    first, last = min(months), max(months)
+    return (
+        timescale.utc(year, first, 1),
+        timescale.utc(year + last // 12, last % 12 + 1, 0, 23, 59, 59),
+    )
+
+def _daysOf(year, months):
+    # the dates of the months, and for each month the indexes of its days
+    # into listDates(year)
+    dates = [ymd for ymd in listDates(year) if ymd[1] in months]
+    index = {}
+    for i, (_, month, _) in enumerate(listDates(year)):
+        index.setdefault(month, []).append(i)
+    return dates, index
+
+def _dateColumns(year, months):
+    dates, _ = _daysOf(year, months)
+    return {
+        "month": [month for _, month, _ in dates],
+        "day": [day for _, _, day in dates],
+    }
+
+
+def calculateSunRiseSet(year, months=MONTHS):
+    """Sunrise, sunset and twilight of each day at the latitudes of the
+    tables, as rise[level][day][latitude] and set[level][day][latitude] in
+    TT, NaN on days without. Each crossing is filed under its UTC day."""
+
+    def combine(results):
+        # slices of each month, level and latitude in that order
+        step = len(SUN_LEVELS) * len(LATITUDES)
+        columns = _dateColumns(year, months)
+        for key in ("rise", "set"):
+            # [crit][lat][day] of each month, joined along the days
+            byMonth = [
+                np.reshape([s[key] for s in results[i:i+step]],
+                    (len(SUN_LEVELS), len(LATITUDES), -1))
+                for i in range(0, len(results), step)
+            ]
+            columns[key] = np.concatenate(byMonth, axis=2).swapaxes(1, 2)
+        columns.update({"levels": SUN_LEVELS, "latitudes": LATITUDES})
+        return columns
+
+    @cached("sunriseset", year,
+        slices=[
+            (month, crit, lat)
+            for month in months for crit in SUN_LEVELS for lat in LATITUDES
+        ],
+        combine=combine,
+        latest=(list(months) == MONTHS))
+    def calculate(year, slices):
+        crits = sorted(set(crit for _, crit, _ in slices), reverse=True)
+        calcLats = sorted(set(lat for _, _, lat in slices))
+        utcStart, utcEnd = _span(year, [month for month, _, _ in slices])
+
+        # all thresholds and latitudes are searched on the same positions of
+        # the sun
+        print("Calculating: sun is below horizont with %s degrees." % (
+            ", ".join("%f" % -crit for crit in crits)))
+
+        positions = PositionCache(Earth, utcStart, utcEnd)
+        jd, lat_i, crit_i, direction = findRiseSet(
+            utcStart,
+            utcEnd,
+            altitudeOf(positions, Sun),
+            calcLats,
+            crits,
+        )
+
+        # rise[crit][lat][day] and set[crit][lat][day], in order of time so
+        # that a later crossing on the same day overwrites an earlier one
+        dates, index = _daysOf(year, MONTHS)
+        riseset = {
+            key: np.full((len(crits), len(calcLats), len(dates)), np.nan)
+            for key in ("rise", "set")
+        }
+        day_i = utcDayOfYear(timescale, jd, year)
+        for key, selected in (("rise", direction > 0), ("set", direction < 0)):
+            selected &= day_i >= 0
+            riseset[key][crit_i[selected], lat_i[selected], day_i[selected]] =\
+                jd[selected]
+
+        return [
+            {
+                key: riseset[key][
+                    crits.index(crit), calcLats.index(lat), index[month]]
+                for key in ("rise", "set")
+            }
+            for month, crit, lat in slices
+        ]
+
+    return calculate()
+
+
+def calculateMoonPhase(year, months=MONTHS):
+    """Moon rise and set of each day at the latitudes of the tables, as
+    rise[day][latitude] and set[day][latitude] in TT, NaN on days without,
+    and the phases (0 to 3 for new moon to last quarter) with their times
+    in TT as phase and phaseTime."""
+
+    def combine(results):
+        # the phases, then the slices of each latitude, for each month
+        step = 1 + len(LATITUDES)
+        phases = [results[i] for i in range(0, len(results), step)]
+        riseset = [results[i+1:i+step] for i in range(0, len(results), step)]
+        columns = _dateColumns(year, months)
+        for key in ("rise", "set"):
+            columns[key] = np.concatenate([
+                np.stack([s[key] for s in month], axis=1) for month in riseset
+            ])
+        columns.update({
+            "latitudes": LATITUDES,
+            "phaseTime": np.concatenate([s["phaseTime"] for s in phases]),
+            "phase": np.concatenate([s["phase"] for s in phases]),
+        })
+        return columns
+
+    @cached("moonphase", year,
+        parameters={"horizon": MOON_HORIZON},
+        slices=[
+            s for month in months for s in
+            [("phases", month)] + [("riseset", month, lat) for lat in LATITUDES]
+        ],
+        combine=combine,
+        latest=(list(months) == MONTHS))
+    def calculate(year, slices):
+        utcStart, utcEnd = _span(year, [s[1] for s in slices])
+        results = {}
+
+        # 1. rise and set times, for all latitudes at once, filed under the
+        # UTC day they happen
+        calcLats = sorted(set(s[2] for s in slices if s[0] == "riseset"))
+        if calcLats:
+            print("Search moon rise / set @ ", utcStart, utcEnd)
+
+            positions = PositionCache(Earth, utcStart, utcEnd)
+            jd, lat_i, _, direction = findRiseSet(
+                utcStart,
+                utcEnd,
+                altitudeOf(positions, Moon, correction=moonLimbCorrection),
+                calcLats,
+                [MOON_HORIZON],
+            )
+
+            # rise[lat][day] and set[lat][day], in order of time so that a
+            # later event on the same day overwrites an earlier one
+            dates, index = _daysOf(year, MONTHS)
+            riseset = {
+                key: np.full((len(calcLats), len(dates)), np.nan)
+                for key in ("rise", "set")
+            }
+            day_i = utcDayOfYear(timescale, jd, year)
+            for key, selected in (
+                ("rise", direction > 0), ("set", direction < 0)
+            ):
+                selected &= day_i >= 0
+                riseset[key][lat_i[selected], day_i[selected]] = jd[selected]
+
+            for s in slices:
+                if s[0] == "riseset":
+                    results[s] = {
+                        key: riseset[key][calcLats.index(s[2]), index[s[1]]]
+                        for key in ("rise", "set")
+                    }
+
+        # 2. calcualte moon phases, filed under the UTC month they happen
+        phaseMonths = [s[1] for s in slices if s[0] == "phases"]
+        if phaseMonths:
+            print("Searching for moon phase...")
+            t, y = almanac.find_discrete(
+                *_span(year, phaseMonths), almanac.moon_phases(ephemeris421))
+            month = np.array([ti.utc[1] for ti in t], dtype=int)
+            for m in phaseMonths:
+                results[("phases", m)] = {
+                    "phaseTime": t.tt[month == m], "phase": y[month == m]}
+
+        return [results[s] for s in slices]
+
+    return calculate()
+
+
+def calculateSolarterms(year, months=MONTHS):
+    """The solar terms beginning in the months, with their times in TT."""
+
+    def combine(results):
+        return {
+            "names": np.concatenate([s["names"] for s in results]),
+            "time": np.concatenate([s["time"] for s in results]),
+        }
+
+    @cached("solarterms", year,
+        slices=list(months),
+        combine=combine,
+        latest=(list(months) == MONTHS))
+    def calculate(year, slices):
+        def solartermsAt(t):
+            applyNutation(t)
+            e = Earth.at(t)
+            _, slon, _ = e.observe(Sun).apparent().ecliptic_latlon('date')
+            return (slon.radians // (tau / 24) % 24).astype(int)
+        solartermsAt.rough_period=15
+
+        t, y = almanac.find_discrete(*_span(year, slices), solartermsAt)
+
+        month = np.array([ti.utc[1] for ti in t], dtype=int)
+        return [
+            {
+                "names": np.array(
+                    [SOLARTERMS[yi] for yi in y[month == m]], dtype=str),
+                "time": t.tt[month == m],
+            }
+            for m in slices
+        ]
+
+    return calculate()
+
+
+def calculatePlanets(year, months=MONTHS):
+    """Apparent right ascension (in hours), declination and ecliptic
+    longitude (in degrees) of the planets at 0h UTC of each day, as
+    ra[planet][day] and so on."""
+
+    def combine(results):
+        # slices of each month and planet in that order
+        step = len(PLANETS)
+        columns = _dateColumns(year, months)
+        for key in ("ra", "dec", "ecllon"):
+            columns[key] = np.concatenate([
+                np.array([s[key] for s in results[i:i+step]])
+                for i in range(0, len(results), step)
+            ], axis=1)
+        columns["planets"] = list(PLANETS)
+        return columns
+
+    @cached("planets", year, version=2,
+        slices=[(month, name) for month in months for name in PLANETS],
+        combine=combine,
+        latest=(list(months) == MONTHS))
+    def calculate(year, slices):
+        # all planets on all days of the months at once
+        months = sorted(set(month for month, _ in slices))
+        names = sorted(set(name for _, name in slices))
+        dates, _ = _daysOf(year, months)
+        yyyy, mm, dd = np.array(dates).T
+        utc0 = applyNutation(timescale.utc(yyyy, mm, dd))
+
+        stacked = StackedEphemeris(Earth, [PLANETS[name] for name in names])
+        ra, dec, _ = stacked.radec(utc0, epoch="date")
+        _, ecllon, _ = stacked.eclipticLatLon(utc0)
+
+        results = []
+        for month, name in slices:
+            i = names.index(name)
+            days = (mm == month)
+            results.append({
+                "ra": ra.hours[i][days].tolist(),
+                "dec": dec.degrees[i][days].tolist(),
+                "ecllon": ecllon.degrees[i][days].tolist(),
+            })
+        return results
+
+    return calculate()
@@ -7,11 +7,90 @@ from skyfield.units import Angle
 from skyfield.earthlib import sidereal_time
 from skyfield.nutationlib import iau2000b
 
+from jplephem.spk import SPK
 from pytz import timezone
+import glob
+import os
+import sys
+
+
+EPHEMERIS = "de421.bsp"
+# excerpts written by extract_ephemeris.py, each named by the years it
+# covers, with EPHEMERIS_MARGIN days before and after them, e.g. for the
+# diagram of planets of each month showing 2 months before and 3 after it
+EPHEMERIS_EXCERPT = "de421-excerpt-%d-%d.bsp"
+EPHEMERIS_EXCERPTS = "de421-excerpt-*-*.bsp"
+EPHEMERIS_MARGIN = 120 # days
+# NAIF codes of the bodies below, each of which an excerpt needs the chain of
+# segments of, from the solar system barycenter (0) to it
+EPHEMERIS_TARGETS = [10, 199, 299, 399, 301, 499, 5, 6, 7, 8, 9]
+
+
+def commandLineYears(argv=None):
+    """The first and last year given on the command line, as scripts take
+    them: "2020", "2020 2022" or "2020-2029". None if there are none."""
+    argv = sys.argv if argv is None else argv
+    years = argv[1].split("-") if len(argv) > 1 else []
+    if len(argv) > 2 and argv[2].isdigit():
+        years.append(argv[2])
+    if not years or not all(year.isdigit() for year in years):
+        return None
+    years = [int(year) for year in years]
+    return min(years), max(years)
+
+
+def ephemerisSpan(first, last):
+    """TDB julian dates to be covered by the ephemeris for the years first
+    to last."""
+    return (
+        timescale.utc(first, 1, 1).tdb - EPHEMERIS_MARGIN,
+        timescale.utc(last + 1, 1, 1).tdb + EPHEMERIS_MARGIN,
+    )
+
+
+def segmentChains(segments, targets=EPHEMERIS_TARGETS):
+    """Those of segments (of jplephem) leading from the solar system
+    barycenter to each of targets, or None if some target is not reached."""
+    byTarget = {segment.target: segment for segment in segments}
+    chains = set()
+    for target in targets:
+        while target != 0:
+            if target not in byTarget:
+                return None
+            chains.add(byTarget[target])
+            target = byTarget[target].center
+    return [segment for segment in segments if segment in chains]
+
+
+def excerptCovering(first, last):
+    """Path of the smallest excerpt of the ephemeris covering the years
+    first to last, or None. The span of an excerpt, and that it holds all
+    segments needed for the bodies, are checked with its segments, not taken
+    from its name."""
+    start, end = ephemerisSpan(first, last)
+    for path in sorted(glob.glob(EPHEMERIS_EXCERPTS), key=os.path.getsize):
+        spk = SPK.open(path)
+        segments = segmentChains(spk.segments)
+        covers = segments is not None and (
+            max(s.start_jd for s in segments) <= start and
+            min(s.end_jd for s in segments) >= end)
+        spk.close()
+        if covers:
+            return path
+    return None
+
+
+def loadEphemeris(years=None):
+    """Load the smallest excerpt of the ephemeris covering the years (first,
+    last), by default those of the command line, or the full DE421 if there
+    is none. Either file is memory mapped by jplephem, so that processes
+    loading it share its pages."""
+    years = years or commandLineYears()
+    return load((years and excerptCovering(*years)) or EPHEMERIS)
 
 
-ephemeris421 = load("de421.bsp")
 timescale = load.timescale()
+ephemeris421 = loadEphemeris()
 BJT = timezone("Asia/Shanghai")
 UTC = timezone("UTC")
 
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+
+import numpy as np
+from jplephem.spk import S_PER_DAY, T0
+from skyfield.constants import AU_KM, AU_M, C, C_AUDAY, DEG2RAD, GS
+from skyfield.functions import dots, length_of, rot_x, to_spherical
+from skyfield.relativity import add_aberration, light_time_difference
+from skyfield.relativity import rmasses
+from skyfield.units import Angle, Distance
+
+
+# Skyfield observes one body per call of observe(), walking the segments of
+# its ephemeris, iterating the light-time and applying deflection and
+# aberration each time again, so that tracking ten bodies costs ten times the
+# Python overhead of observe(), apparent() and radec().
+#
+# StackedEphemeris instead evaluates the Chebyshev polynomials of all
+# segments needed by all bodies at all times in one pass of array
+# operations, and applies light-time, deflection, aberration and the
+# rotation into the frame of date to all bodies at once, the same way
+# Skyfield does for each. Positions are returned as (body, time, xyz)
+# arrays, other quantities as (body, time) arrays.
+
+DEFLECTORS = ["sun", "jupiter", "saturn"] # as in skyfield add_deflection()
+
+
+def _vectorsOf(body):
+    # (vector, sign) of the vectors summed up to body: a single segment, or
+    # the vector_functions of a sum of them, which older skyfield (before
+    # 1.33) keeps as positives and negatives instead
+    if hasattr(body, "vector_functions"):
+        return [(vector, 1) for vector in body.vector_functions]
+    if hasattr(body, "positives"):
+        return [(vector, 1) for vector in body.positives] + \
+            [(vector, -1) for vector in body.negatives]
+    return [(body, 1)]
+
+
+def _deflect(position, observer, deflector, rmass):
+    # Adds to position, seen from observer, the deflection of its light by
+    # the mass at deflector of reciprocal mass rmass, as NOVAS grav_vec()
+    # and skyfield do; all as (xyz, ...) arrays in au. Not applied where the
+    # deflector is within 1 arcsec of the line of sight.
+    pq = observer + position - deflector
+    pe = observer - deflector
+
+    pmag = length_of(position)
+    qmag = length_of(pq)
+    emag = length_of(pe)
+    phat = position / np.where(pmag, pmag, 1.0)
+    qhat = pq / np.where(qmag, qmag, 1.0)
+    ehat = pe / np.where(emag, emag, 1.0)
+
+    pdotq = dots(phat, qhat)
+    qdote = dots(qhat, ehat)
+    edotp = dots(ehat, phat)
+
+    fac1 = 2.0 * GS / (C * C * emag * AU_M * rmass)
+    fac2 = 1.0 + qdote
+    position += np.where(np.abs(edotp) > 0.99999999999, 0.0,
+        fac1 * (pdotq * ehat - edotp * qhat) / fac2 * pmag)
+
+
+class StackedEphemeris:
+
+    """Positions of bodies of the ephemeris as seen by observer, e.g. the
+    earth, for all of them at once.
+
+    bodies and observer are given as taken from the ephemeris, e.g.
+    ephemeris["Mars"]. Only sums of ephemeris segments of type 2 are
+    supported, and stars are not.
+    """
+
+    @staticmethod
+    def supports(body):
+        """Whether body can be observed, or be the observer."""
+        if getattr(body, "center", None) != 0:
+            return False
+        return all(
+            getattr(vector, "spk_segment", None) is not None and
+            vector.spk_segment.data_type == 2
+            for vector, _ in _vectorsOf(body))
+
+    def __init__(self, observer, bodies):
+        self.observer = observer
+        self.bodies = list(bodies)
+        self.ephemeris = observer.ephemeris
+
+        self.deflectors = []
+        for name in DEFLECTORS:
+            try:
+                self.deflectors.append(self.ephemeris[name])
+            except KeyError:
+                self.deflectors.append(self.ephemeris[name + " barycenter"])
+
+        # (initial epoch, interval length, coefficients) of each segment, as
+        # jplephem keeps them, and the chain of segments of each body, as
+        # [(index, sign), ...]
+        self.segments = []
+        self.chains = {}
+        found = {}
+        for body in [observer] + self.bodies + self.deflectors:
+            if body in self.chains: continue
+            if not self.supports(body):
+                raise ValueError("Unsupported body: %r" % body)
+            chain = []
+            for vector, sign in _vectorsOf(body):
+                segment = vector.spk_segment
+                if segment not in found:
+                    found[segment] = len(self.segments)
+                    self.segments.append(segment._data)
+                chain.append((found[segment], sign))
+            self.chains[body] = chain
+        self.degree = max(len(c) for _, _, c in self.segments)
+        self._last = None
+
+    def _chebyshev(self, segment, tdb):
+        # positions and velocities in km and km/day of segment[i] at tdb[i],
+        # as jplephem's Segment.compute_and_differentiate() gives them, with
+        # the coefficients of all segments padded to the same degree
+        coefficients = np.zeros((self.degree, 3, len(tdb)))
+        s = np.empty(len(tdb))
+        length = np.empty(len(tdb))
+        for j in np.unique(segment):
+            init, intlen, c = self.segments[j]
+            i = np.flatnonzero(segment == j)
+            index, offset = np.divmod((tdb[i] - T0) * S_PER_DAY - init, intlen)
+            index = index.astype(int)
+            count = c.shape[2]
+            if np.any((index < 0) | (index > count)):
+                raise ValueError("Times out of the range of the ephemeris")
+
+            # the end of the last interval still belongs to it
+            last = (index == count)
+            index[last] -= 1
+            offset[last] += intlen
+
+            # highest degree first
+            coefficients[-len(c):, :, i] = c[:, :, index]
+            s[i] = 2.0 * offset / intlen - 1.0
+            length[i] = intlen
+
+        s2 = 2.0 * s
+        w0 = w1 = 0.0
+        wlist = []
+        for coefficient in coefficients[:-1]:
+            w2 = w1
+            w1 = w0
+            w0 = coefficient + (s2 * w1 - w2)
+            wlist.append(w1)
+        components = coefficients[-1] + (s * w0 - w1)
+
+        dw0 = dw1 = 0.0
+        for w1 in wlist:
+            dw2 = dw1
+            dw1 = dw0
+            dw0 = 2.0 * w1 + dw1 * s2 - dw2
+        rates = w0 + s * dw0 - dw1
+        rates /= length
+        rates *= 2.0
+        rates *= S_PER_DAY
+
+        return components, rates
+
+    def _at(self, bodies, tdb):
+        # barycentric positions and velocities in au and au/day, as
+        # (xyz, body, time), of each of bodies at its row of tdb
+        tdb = np.broadcast_to(tdb, (len(bodies), np.shape(tdb)[-1]))
+        segment, time, terms = [], [], []
+        for b, body in enumerate(bodies):
+            for j, sign in self.chains[body]:
+                terms.append((b, sign))
+                segment.append(np.full(tdb.shape[1], j))
+                time.append(tdb[b])
+        p, v = self._chebyshev(np.concatenate(segment), np.concatenate(time))
+
+        position = np.zeros((3,) + tdb.shape)
+        velocity = np.zeros((3,) + tdb.shape)
+        for n, (b, sign) in enumerate(terms):
+            i = slice(n * tdb.shape[1], (n + 1) * tdb.shape[1])
+            position[:, b] += sign * p[:, i]
+            velocity[:, b] += sign * v[:, i]
+        return position / AU_KM, velocity / AU_KM
+
+    def _astrometric(self, t):
+        # as skyfield's _correct_for_light_travel_time() for each body, with
+        # the light-time iterated until it converges for all times of a body
+        tdb = np.atleast_1d(t.tdb)
+        observer, observerVelocity = self._at([self.observer], tdb)
+        position, velocity = self._at(self.bodies, tdb)
+        distance = length_of(position - observer)
+        light_time0 = np.zeros(distance.shape)
+        light_time = distance / C_AUDAY
+        active = np.arange(len(self.bodies))
+        for i in range(10):
+            delta = light_time[active] - light_time0[active]
+            active = active[np.any(np.abs(delta) >= 1e-12, axis=1)]
+            if len(active) == 0:
+                break
+            p, v = self._at(
+                [self.bodies[b] for b in active], tdb - light_time[active])
+            position[:, active], velocity[:, active] = p, v
+            light_time0[active] = light_time[active]
+            light_time[active] = length_of(p - observer) / C_AUDAY
+        else:
+            raise ValueError("light-travel time failed to converge")
+        return (
+            position - observer, velocity - observerVelocity, light_time,
+            observer, observerVelocity
+        )
+
+    def _observe(self, t):
+        # astrometric positions, velocities and light-times, and apparent
+        # positions, as (xyz, body, time); kept for the last t, which is
+        # often asked for several coordinates in a row
+        if self._last is not None and self._last[0] is t:
+            return self._last[1]
+        position, velocity, light_time, observer, observerVelocity = \
+            self._astrometric(t)
+
+        # as skyfield's apparent(), without the deflection by the earth,
+        # which is not applied for an observer at the center of the earth
+        apparent = position.copy()
+        tdb = np.atleast_1d(t.tdb)
+        tlt = length_of(apparent) / C_AUDAY
+        deflectors, _ = self._at(self.deflectors, tdb)
+        for d, name in enumerate(DEFLECTORS):
+            gpv = deflectors[:, d:d+1] - observer
+            dlt = light_time_difference(apparent, gpv)
+            tclose = np.where(dlt > 0.0, tdb - dlt, tdb)
+            tclose = np.where(tlt < dlt, tdb - tlt, tclose)
+            close, _ = self._at(
+                [self.deflectors[d]] * len(self.bodies), tclose)
+            _deflect(apparent, observer, close, rmasses[name])
+        add_aberration(apparent, observerVelocity, light_time)
+
+        self._last = (t, (position, velocity, light_time, apparent))
+        return self._last[1]
+
+    def observe(self, t):
+        """Astrometric positions and velocities in au and au/day, and
+        apparent positions in au, each as (body, time, xyz); as
+        observer.at(t).observe(body) and its apparent() for each body."""
+        position, velocity, _, apparent = self._observe(t)
+        return (
+            np.moveaxis(position, 0, -1), np.moveaxis(velocity, 0, -1),
+            np.moveaxis(apparent, 0, -1)
+        )
+
+    def apparent(self, t):
+        """Apparent positions in au as (body, time, xyz), as
+        observer.at(t).observe(body).apparent() for each body."""
+        return np.moveaxis(self._observe(t)[3], 0, -1)
+
+    def radec(self, t, epoch=None):
+        """Right ascension, declination and distance of the apparent
+        positions, as (body, time) arrays in Angle and Distance, as radec()
+        of skyfield. With epoch="date", t needs the precession and nutation
+        matrix M, e.g. from applyNutation(t)."""
+        position = self._observe(t)[3]
+        if epoch == "date":
+            position = np.einsum("ij...,j...->i...", t.M, position)
+        elif epoch is not None:
+            raise ValueError("Unsupported epoch: %r" % epoch)
+        r, dec, ra = to_spherical(position)
+        return (
+            Angle(radians=ra, preference="hours"),
+            Angle(radians=dec, signed=True),
+            Distance(au=r),
+        )
+
+    def eclipticLatLon(self, t):
+        """Ecliptic latitude, longitude and distance of date of the apparent
+        positions, as (body, time) arrays, as ecliptic_latlon("date") of
+        skyfield. t needs the precession and nutation matrix M and the
+        earth tilt, e.g. from applyNutation(t)."""
+        _, oblt, _, _, _ = t._earth_tilt
+        rotation = np.einsum(
+            "ij...,jk...->ik...", rot_x(-oblt * DEG2RAD), t.M)
+        position = np.einsum(
+            "ij...,j...->i...", rotation, self._observe(t)[3])
+        d, lat, lon = to_spherical(position)
+        return (
+            Angle(radians=lat, signed=True),
+            Angle(radians=lon),
+            Distance(au=d),
+        )
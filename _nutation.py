@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+import numpy as np
+from skyfield.nutationlib import earth_tilt, iau2000b
+
+
+# Nutation angles (IAU 2000B), the precession-nutation matrix M and the
+# earth tilt (obliquities and equation of the equinoxes, part of the apparent
+# sidereal time) are computed once on a grid of STEP days, and interpolated
+# with cubic polynomials through the 4 nearest grid points for any time in
+# between. Their shortest terms have periods of several days, the
+# interpolation error is about 0.03 milliarcsecond.
+STEP = 0.5      # days
+MARGIN = 30     # days added on each side when the grid has to be extended
+
+_grid = None    # (jd, (dpsi, deps), M, earth tilt), jd in TT
+
+
+def _gridCovering(ts, jd0, jd1):
+    global _grid
+    if _grid is not None and _grid[0][0] <= jd0 and jd1 <= _grid[0][-1]:
+        return _grid
+    if _grid is not None:
+        jd0, jd1 = min(jd0, _grid[0][0]), max(jd1, _grid[0][-1])
+
+    start = np.floor((jd0 - MARGIN) / STEP) * STEP
+    count = int(np.ceil((jd1 + MARGIN - start) / STEP)) + 1
+    jd = start + STEP * np.arange(count)
+
+    # newer skyfield only lets _nutation_angles be set, not read back
+    angles = iau2000b(jd)
+    t = ts.tt_jd(jd)
+    t._nutation_angles = angles
+    _grid = (jd, angles, t.M, earth_tilt(t))
+    return _grid
+
+
+def applyNutation(t):
+    """Sets nutation angles, precession-nutation matrix and earth tilt of t,
+    as a replacement of
+
+        t._nutation_angles = iau2000b(t.tt)
+
+    which leaves the matrices to be computed on each call of radec('date')
+    and the like. The earth tilt is kept as t._earth_tilt, where the
+    obliquity is read from by the ecliptic coordinates of table_of_events
+    and StackedEphemeris; only older skyfield, e.g. 1.18, reads it for gast
+    as well. Returns t."""
+    tt = np.asarray(t.tt)
+    jd, angles, M, tilt = _gridCovering(t.ts, np.amin(tt), np.amax(tt))
+
+    # Lagrange polynomial through jd[k-1] ... jd[k+2], s = 0...1 between
+    # jd[k] and jd[k+1]
+    k = np.clip(np.searchsorted(jd, tt) - 1, 1, len(jd) - 3)
+    s = (tt - jd[k]) / STEP
+    w = (
+        -s * (s - 1) * (s - 2) / 6,
+        (s + 1) * (s - 1) * (s - 2) / 2,
+        -(s + 1) * s * (s - 2) / 2,
+        (s + 1) * s * (s - 1) / 6,
+    )
+    interpolate = lambda y: sum(w[i] * y[..., k+i-1] for i in range(4))
+
+    t._nutation_angles = tuple(interpolate(a) for a in angles)
+    t.M = interpolate(M)
+    t.MT = np.rollaxis(t.M, 1)
+    t._earth_tilt = tuple(interpolate(a) for a in tilt)
+    return t
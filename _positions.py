@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+
+import numpy as np
+from skyfield.constants import C_AUDAY
+from skyfield.positionlib import Apparent, Astrometric
+
+from _ephemeris import StackedEphemeris
+
+
+class PositionCache:
+
+    """Geocentric positions of bodies over [start_time, end_time], observed
+    through the ephemeris only once per body.
+
+    On first request of a body, observer.at(t).observe(body) is evaluated
+    with a single Time array holding a grid of step days, which covers the
+    span plus margin days on each side, together with the quarters of each
+    interval of the grid. Positions and velocities at any other time are
+    then interpolated between the two neighbouring grid points with cubic
+    Hermite polynomials. sample() observes the grids of several bodies of
+    the ephemeris at once.
+
+    The interpolation is checked against the quarters. Wherever its error
+    exceeds tolerance (relative to the distance of the body), e.g. when a
+    planet passes behind the sun and its deflection of light changes within
+    hours, times are observed directly instead, as are times outside the
+    grid. errorBound() gives the largest error left elsewhere, which is
+    about 5e-8 for the moon (a few milliarcseconds) and far less for the
+    planets with the default step of 0.25 day.
+
+    The derivatives at the grid points are those of the observed positions:
+    the velocity given by skyfield for an astrometric position leaves out
+    the change of the light-time, and there is none for an apparent one.
+    The velocity of a position served here is the derivative of the
+    interpolated position.
+    """
+
+    def __init__(self, observer, start_time, end_time,
+        step=0.25, margin=5, tolerance=1e-7
+    ):
+        self.observer = observer
+        self.ts = start_time.ts
+        self.step = step
+        self.tolerance = tolerance
+        count = int(np.ceil((end_time.tt - start_time.tt + 2*margin) / step))
+        self.jd = start_time.tt - margin + step * np.arange(count + 1)
+        self.samples = {}
+
+    def _observe(self, body, t):
+        astrometric = self.observer.at(t).observe(body)
+        return astrometric, astrometric.apparent()
+
+    def sample(self, bodies):
+        """Observes the grid of those of bodies not observed before, all
+        bodies of the ephemeris together with one StackedEphemeris."""
+        bodies = [body for body in bodies if body not in self.samples]
+        if not bodies:
+            return
+
+        # grid points at every fourth index, the quarters of the intervals
+        # in between
+        jd = np.linspace(self.jd[0], self.jd[-1], 4 * len(self.jd) - 3)
+        t = self.ts.tt_jd(jd)
+        observerVelocity = self.observer.at(t).velocity.au_per_d
+        stacked = [b for b in bodies if StackedEphemeris.supports(b)]
+        if stacked and StackedEphemeris.supports(self.observer):
+            positions, velocities, apparents = StackedEphemeris(
+                self.observer, stacked).observe(t)
+            for body, p, v, apparent in zip(
+                stacked, positions, velocities, apparents
+            ):
+                self._track(body, jd, p.T, v.T, observerVelocity,
+                    apparent.T, self.observer.target, body.target)
+        else:
+            stacked = []
+
+        for body in bodies:
+            if body in stacked: continue
+            astrometric, apparent = self._observe(body, t)
+            self._track(body, jd,
+                astrometric.position.au, astrometric.velocity.au_per_d,
+                observerVelocity, apparent.position.au,
+                astrometric.center, astrometric.target)
+
+    def _track(self, body, jd, p, v, observerVelocity, apparent, center,
+        target
+    ):
+        # v is the velocity of the body when the light left it, less that of
+        # the observer. As the light-time tau = |p| / c changes, the body is
+        # seen at p(t) = body(t - tau) - observer(t), changing at
+        #     v - dtau/dt * (v + observerVelocity)
+        # with dtau/dt = u.v / (c + u.(v + observerVelocity)), u = p / |p|.
+        u = p / np.linalg.norm(p, axis=0)
+        moving = v + observerVelocity
+        v = v - np.sum(u * v, axis=0) / (
+            C_AUDAY + np.sum(u * moving, axis=0)) * moving
+
+        # deflection and aberration change the apparent position over time
+        # as well
+        correction = apparent - p
+        tracks = {
+            Astrometric: (p, v),
+            Apparent: (
+                apparent, v + np.gradient(correction, self.step / 4, axis=1)),
+        }
+
+        # An error of the derivatives cancels at the midpoints, not at the
+        # other quarters. It adds s(1-s)^2 or s^2(1-s) times its size to the
+        # interpolation, which peaks at s = 1/3 or 2/3 at 256/243 times its
+        # value at s = 1/4 or 3/4.
+        quarters = np.flatnonzero(np.arange(len(jd)) % 4)
+        k = quarters // 4
+        error = np.zeros(len(self.jd) - 1)
+        for cls, (p, v) in tracks.items():
+            tracks[cls] = p[:, ::4], v[:, ::4]
+            interpolated, _ = self._interpolate(
+                p[:, ::4], v[:, ::4], jd[quarters], k)
+            expected = p[:, quarters]
+            np.maximum.at(error, k,
+                np.linalg.norm(interpolated - expected, axis=0) /
+                np.linalg.norm(expected, axis=0)
+            )
+        error *= 256 / 243
+
+        # the estimated derivatives spread an error into both neighbours
+        rough = error > self.tolerance
+        rough = rough | np.roll(rough, 1) | np.roll(rough, -1)
+        self.samples[body] = (
+            tracks, rough, np.amax(error[~rough], initial=0), center, target
+        )
+
+    def _sample(self, body):
+        self.sample([body])
+        return self.samples[body]
+
+    def _intervals(self, jd):
+        k = ((jd - self.jd[0]) // self.step).astype(int)
+        return np.clip(k, 0, len(self.jd) - 2)
+
+    def _interpolate(self, p, v, jd, k):
+        # Hermite basis on s = 0...1 between grid points k and k+1
+        h = self.step
+        s = (jd - self.jd[k]) / h
+        s2, s3 = s**2, s**3
+        position = (
+            (2*s3 - 3*s2 + 1) * p[:, k] + (s3 - 2*s2 + s) * h * v[:, k] +
+            (3*s2 - 2*s3) * p[:, k+1] + (s3 - s2) * h * v[:, k+1]
+        )
+        velocity = (
+            (6*s2 - 6*s) / h * p[:, k] + (3*s2 - 4*s + 1) * v[:, k] +
+            (6*s - 6*s2) / h * p[:, k+1] + (3*s2 - 2*s) * v[:, k+1]
+        )
+        return position, velocity
+
+    def _position(self, cls, body, t):
+        def observe(t):
+            astrometric, apparent = self._observe(body, t)
+            return apparent if cls is Apparent else astrometric
+
+        jd = np.asarray(t.tt)
+        if np.any((jd < self.jd[0]) | (jd > self.jd[-1])):
+            return observe(t)
+        tracks, rough, _, center, target = self._sample(body)
+        k = self._intervals(jd)
+        rough = rough[k]
+        if np.all(rough):
+            return observe(t)
+
+        p, v = tracks[cls]
+        position, velocity = self._interpolate(p, v, jd, k)
+        if np.any(rough):
+            observed = observe(self.ts.tt_jd(jd[rough]))
+            position[:, rough] = observed.position.au
+            velocity[:, rough] = self._interpolate(p, v, jd[rough], k[rough])[1]
+        return cls(position, velocity, t, center, target)
+
+    def apparent(self, body, t):
+        """Same as observer.at(t).observe(body).apparent()"""
+        return self._position(Apparent, body, t)
+
+    def astrometric(self, body, t):
+        """Same as observer.at(t).observe(body)"""
+        return self._position(Astrometric, body, t)
+
+    def errorBound(self, body):
+        """Largest error of interpolated positions of body, relative to its
+        distance, as found at the quarters of the intervals of the grid."""
+        return self._sample(body)[2]
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+
+import numpy as np
+from skyfield.constants import AU_KM, AU_M
+from skyfield.earthlib import terra
+
+from _constants import EARTH_RADIUS, MOON_RADIUS
+from _nutation import applyNutation
+from _rootfinder import FinderReport, collect_report, refine_roots
+
+
+# Rise, set and twilight of a body for observers at many sites, found all
+# at once.
+#
+# The geocentric apparent position of the body, the sidereal time and the
+# nutation are computed once per time, and shared by all sites. Only the
+# observer's place on the rotating earth, and the direction of its zenith,
+# differ between sites. The altitude follows from both as a few array
+# operations, instead of a topocentric observe() per site.
+
+
+# Levels of the center of the sun at sunrise and sunset (with its upper limb
+# on the horizon, lifted by refraction), and at the end of civil and of
+# astronomical twilight.
+SUN_LEVELS = [-0.8333, -6, -18]
+
+# the moon is up when its altitude is above -0.5666 - moonRadius + parallax,
+# or its altitude plus moonLimbCorrection() above MOON_HORIZON
+MOON_HORIZON = -0.5666
+
+def moonLimbCorrection(km):
+    moonRadius = MOON_RADIUS / km / np.pi * 180.0 # 月球半径
+    parallax = EARTH_RADIUS / km / np.pi * 180.0  # 月球视差
+    return moonRadius - parallax
+
+
+def altitudeOf(positions, body, correction=None):
+    """Build altitude(t, latitudes, longitudes=0, elevations=0), giving the
+    apparent altitude in degrees of body seen from the given sites (in
+    degrees north and east, and meters above sea level), as
+    Topos(...).at(t).observe(body).apparent().altaz() would.
+
+    With correction given, correction(km) in degrees is added to the
+    altitude, km being the distance of the body from the observer. Use it
+    to have the altitude of a limb instead of the center, or for any other
+    term depending on the distance.
+
+    positions is a PositionCache around the earth. The sites are broadcast
+    against t: give columns, e.g. latitudes[:, np.newaxis], for the
+    altitudes of each site at all times, or arrays as long as t for one
+    altitude at each time.
+
+    The position is observed from the center of the earth and shifted to
+    the observer, which leaves out the light time over the earth's radius
+    and the diurnal aberration, both well under an arcsecond.
+
+    The position and sidereal time at the times of the last call are kept,
+    so that calls for the same times and other sites, e.g. findRiseSet on
+    chunks of a list of sites, compute them only once.
+    """
+
+    last = {}
+
+    def geocentric(t):
+        key = np.asarray(t.tt).tobytes()
+        if key not in last:
+            applyNutation(t)
+            # in the true equator and equinox of date, like terra()
+            apparent = positions.apparent(body, t).position.au
+            last.clear()
+            last[key] = (
+                np.einsum("ij...,j...->i...", t.M, apparent), t.gast)
+        return last[key]
+
+    def altitude(t, latitudes, longitudes=0.0, elevations=0.0):
+        target, gast = geocentric(t)
+        latitude, longitude, elevation = np.broadcast_arrays(
+            np.radians(latitudes), np.radians(longitudes),
+            np.asarray(elevations) / AU_M)
+        gast = gast + 0 * latitude # of the same shape as the sites
+        theta = np.radians(15.0 * gast) + longitude
+
+        target = target.reshape((3,) + (1,) * (np.ndim(latitude) - 1) + (-1,))
+        observer, _ = terra(latitude, longitude, elevation, gast)
+        topocentric = target - observer
+
+        zenith = np.array((
+            np.cos(latitude) * np.cos(theta),
+            np.cos(latitude) * np.sin(theta),
+            np.sin(latitude) + 0 * theta,
+        ))
+        distance = np.linalg.norm(topocentric, axis=0)
+        altitude = np.degrees(np.arcsin(
+            np.sum(topocentric * zenith, axis=0) / distance))
+        if correction is not None:
+            altitude += correction(distance * AU_KM)
+        return altitude
+
+    altitude.rough_period = 0.5  # twice a day
+    return altitude
+
+
+def findRiseSet(
+    start_time, end_time, altitude, latitudes, levels,
+    longitudes=0.0,
+    elevations=0.0,
+    num=96,             # samples per day
+    epsilon=1e-8,       # in julian days
+    method="illinois"
+):
+    """Find where altitude(t, latitudes, longitudes, elevations), see
+    altitudeOf, crosses each of the given levels at each of the given sites.
+
+    The altitudes of all sites are sampled num times a day over
+    [start_time, end_time] with a single call, which takes memory for a few
+    arrays of 3 x sites x samples. Pass thousands of sites in chunks.
+    Every level is bracketed on these, and all brackets of all sites and
+    levels are refined together
+    by refine_roots, with one call of altitude per step. Crossings due to a
+    jump are dropped, as in level_crossing_finder.
+
+    A level touched only for less than 1/num day between two samples is
+    missed, e.g. the astronomical twilight around midsummer midnight at
+    latitudes near 50 degrees. Sampling is cheap here, hence the default of
+    every 15 minutes.
+
+    Returns (jd, site, level, direction), arrays in order of time: jd of
+    each crossing in TT, the indexes of its site and level into the given
+    lists, and +1 where the body rises above the level or -1 where it sets
+    below.
+    """
+
+    jd1 = end_time.tt
+    jd0 = start_time.tt
+    ts = start_time.ts
+    assert jd0 < jd1
+
+    report = FinderReport(
+        "findRiseSet", altitude, method, start_time, end_time, epsilon)
+    collect_report(report)
+    altitude = report.wrap(altitude)
+
+    sites = np.broadcast_arrays(*(
+        np.asarray(a, dtype=float) for a in (latitudes, longitudes, elevations)
+    ))
+    level_n = np.asarray(levels, dtype=float)
+
+    jd = np.linspace(jd0, jd1, int((jd1 - jd0) * num) + 1)
+    y_n = altitude(ts.tt_jd(jd), *(a[:, np.newaxis] for a in sites))
+
+    above = y_n[np.newaxis, :, :] > level_n[:, np.newaxis, np.newaxis]
+    level_i, site_i, brackets = np.nonzero(
+        above[:, :, :-1] != above[:, :, 1:])
+    level_y = level_n[level_i]
+    y_a = y_n[site_i, brackets]
+    y_b = y_n[site_i, brackets+1]
+
+    def f(t, i):
+        return altitude(t, *(a[site_i[i]] for a in sites)) - level_y[i]
+
+    jd_x, y_x, y_ra, y_rb = refine_roots(
+        ts, f,
+        jd[brackets], jd[brackets+1], y_a - level_y, y_b - level_y,
+        epsilon=epsilon, method=method, report=report
+    )
+    # a jump keeps its height however narrow the bracket gets
+    continuous = np.abs(y_ra - y_rb) < np.abs(y_b - y_a) / 2
+    report.brackets += len(brackets)
+    report.rejected += int(np.sum(~continuous))
+
+    direction = np.where(above[level_i, site_i, brackets+1], 1, -1)
+    order = np.argsort(jd_x[continuous], kind="stable")
+    return report.finish(tuple(
+        a[continuous][order]
+        for a in (jd_x, site_i, level_i, direction)
+    ))
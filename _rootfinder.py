@@ -1,15 +1,137 @@
 #!/usr/bin/env python3
 
+import json
+import threading
+import time
 import numpy as np
 
+
+# One FinderReport per call of root_finder or critical_point_finder, in the
+# order of the calls, kept in the list returned by start_reports() for the
+# thread making the calls. Reports of threads which have not started one,
+# e.g. of the workers of a thread pool, are not kept.
+_collected = threading.local()
+
+
+def start_reports():
+    """A new, empty list receiving the FinderReport of each later call of a
+    finder by this thread, instead of the list started before."""
+    _collected.reports = []
+    return _collected.reports
+
+
+def collect_report(report):
+    """Keeps report in the list of start_reports(), if started by this
+    thread."""
+    reports = getattr(_collected, "reports", None)
+    if reports is not None:
+        reports.append(report)
+
+
+class FinderReport:
+
+    """Evaluation budget of one call to root_finder or critical_point_finder.
+
+    calls and scalar_calls count the invocations of f with a Time array and
+    with a single Time, points the times evaluated in total and seconds the
+    wall time spent inside f. brackets is the number of brackets (or
+    suspected critical points) found, rejected those dropped at the end for
+    not being continuous (or not flat). iterations holds the number of
+    refinement steps taken by each bracket.
+    """
+
+    def __init__(self, finder, f, method, start_time, end_time, epsilon):
+        self.finder = finder
+        self.name = getattr(f, "__qualname__", repr(f))
+        self.method = method
+        self.start = start_time.utc_iso()
+        self.end = end_time.utc_iso()
+        self.epsilon = epsilon
+        self.calls = 0
+        self.scalar_calls = 0
+        self.points = 0
+        self.seconds = 0.0
+        self.total_seconds = 0.0
+        self.brackets = 0
+        self.rejected = 0
+        self.iterations = []
+        self._started = time.perf_counter()
+
+    def wrap(self, f):
+        """f counted and timed into this report."""
+        def counted(t, *args):
+            start = time.perf_counter()
+            y = f(t, *args)
+            self.seconds += time.perf_counter() - start
+            if np.ndim(t.tt) == 0:
+                self.scalar_calls += 1
+            else:
+                self.calls += 1
+            self.points += np.size(t.tt)
+            return y
+        counted.rough_period = getattr(f, "rough_period", None)
+        return counted
+
+    def record(self, steps):
+        self.iterations += [int(n) for n in steps]
+
+    def finish(self, founds):
+        self.total_seconds = time.perf_counter() - self._started
+        return founds
+
+    def to_dict(self):
+        data = {
+            key: value for key, value in self.__dict__.items()
+            if not key.startswith("_")
+        }
+        data["max_iterations"] = max(self.iterations, default=0)
+        return data
+
+    def to_json(self, **kvargs):
+        return json.dumps(self.to_dict(), **kvargs)
+
+    def __str__(self):
+        return (
+            "%s(%s, %s): %d calls (%d scalar), %d points, "
+            "%d brackets (%d rejected), <= %d iterations, %.3fs in f"
+        ) % (
+            self.finder, self.name, self.method,
+            self.calls + self.scalar_calls, self.scalar_calls, self.points,
+            self.brackets, self.rejected, max(self.iterations, default=0),
+            self.seconds
+        )
+
+
+def reports_to_json(reports, **kvargs):
+    return json.dumps([report.to_dict() for report in reports], **kvargs)
+
+
+
 def critical_point_finder(
     start_time, end_time, f,
     num=12,
-    epsilon=1e-4 # days
+    epsilon=1e-4, # days
+    method="bisect"
 ):
     """Given f(t) as a function of time, find out it's critical points
         df(t)/dt = 0
 
+    f(times) is calculated over a series of time from [start_time, end_time].
+    Wherever 3 neighbouring values f(time_i), f(time_i+1), f(time_i+2) are
+    not monotonic, a critical point is suspected. All suspects are then
+    narrowed down together (see refine_critical_points), and those with
+        abs( df/dt ) < epsilon
+    at the end are returned as
+        ((time_a, time_x, time_b), (f(time_a), f(time_x), f(time_b)))
+
+    method selects how suspects are narrowed down: "bisect" halves them at
+    each step, "parabolic" jumps to the vertex of the parabola through the
+    triple and needs far fewer evaluations of a smooth f. With "chebyshev",
+    num is not used and the suspects are taken from a ChebyshevProxy of f
+    instead of a series of times.
+
+    The evaluations of f spent by each call are kept as a FinderReport in
+    the list of start_reports(), if started by this thread.
     """
 
     jd1 = end_time.tt
@@ -17,11 +139,20 @@ def critical_point_finder(
     ts = start_time.ts
     assert jd0 < jd1
 
+    report = FinderReport(
+        "critical_point_finder", f, method, start_time, end_time, epsilon)
+    collect_report(report)
+    f = report.wrap(f)
+
+    if method == "chebyshev":
+        return report.finish(_chebyshev_critical_points(
+            start_time, end_time, f, epsilon, report))
+
     periods = (jd1 - jd0) / f.rough_period
     if periods < 1.0:
         periods = 1.0
 
-    jd = np.linspace(jd0, jd1, periods * num // 1.0)
+    jd = np.linspace(jd0, jd1, int(periods * num // 1.0))
 
     ts_n = ts.tt_jd(jd)
     y_n = f(ts_n)
@@ -31,74 +162,170 @@ def critical_point_finder(
 #        print(ts_n[i].utc_iso().replace("T", " ").replace("Z", ""), "\t", y_n[i])
 #    exit()
 
+    dy = np.diff(y_n)
+    suspects = np.flatnonzero(dy[:-1] * dy[1:] <= 0)
+
+    jd_a, jd_x, jd_b, y_a, y_x, y_b = refine_critical_points(
+        ts, lambda t, i: f(t),
+        jd[suspects], jd[suspects+1], jd[suspects+2],
+        y_n[suspects], y_n[suspects+1], y_n[suspects+2],
+        epsilon=epsilon, method=method, report=report
+    )
+
+    dydt_a = (y_x - y_a) / (jd_x - jd_a)
+    dydt_b = (y_b - y_x) / (jd_b - jd_x)
+    accepted = np.abs(dydt_a + dydt_b) / 2 < epsilon
+    report.brackets += len(suspects)
+    report.rejected += int(np.sum(~accepted))
+
     founds = []
-    for i in range(0, len(ts_n)-2):
-        jd_i0, y_i0 = ts_n[i].tt, y_n[i]
-        jd_i1, y_i1 = ts_n[i+1].tt, y_n[i+1]
-        jd_i2, y_i2 = ts_n[i+2].tt, y_n[i+2]
-        dydt1 = (y_i1 - y_i0) / (jd_i1 - jd_i0)
-        dydt2 = (y_i2 - y_i1) / (jd_i2 - jd_i1)
-        #average_dydt = (dydt1 + dydt2) / 2
-        
-        """if abs(average_dydt) < epsilon:
-            founds.append((
-                (ts_n[i], ts_n[i+1], ts_n[i+2]),
-                (y_i0, y_i1, y_i2)
-            ))
-            continue"""
-
-        #if dydt1 * dydt2 > 0: continue
-        if (y_i1 - y_i0) * (y_i2 - y_i1) > 0: continue
-
-        #print("Suspect:", ts_n[i].utc_iso(), dydt1, "\t", ts_n[i+2].utc_iso(), dydt2)
-
-        # find between ts_i0 and ts_i2
-        jd_a, jd_x, jd_b = jd_i0, jd_i1, jd_i2 
-        y_a, y_x, y_b = y_i0, y_i1, y_i2
-        dydt_a = dydt1
-        dydt_b = dydt2
-        
-        while abs(jd_b - jd_a) > epsilon: #abs( (dydt_a + dydt_b) / 2 ) > epsilon:
-            jd_x1 = (jd_a + jd_x) / 2
-            jd_x2 = (jd_x + jd_b) / 2
-
-            ts_x1 = ts.tt_jd(jd_x1)
-            ts_x2 = ts.tt_jd(jd_x2)
-            y_x1 = f(ts_x1)
-            y_x2 = f(ts_x2)
-
-            # a --- x1 --- x --- x2 --- b
-
-            if (y_x1 - y_a) * (y_x - y_x1) < 0:
-                jd_b, y_b = jd_x, y_x
-                jd_x, y_x = jd_x1, y_x1
-            elif (y_x - y_x1) * (y_x2 - y_x) < 0:
-                jd_a, y_a = jd_x1, y_x1
-                jd_b, y_b = jd_x2, y_x2
-            else:
-                jd_a, y_a = jd_x, y_x
-                jd_x, y_x = jd_x2, y_x2
-
-            """print(
-                "\t",
-                ts.tt_jd(jd_a).utc_iso(), "\t",
-                ts.tt_jd(jd_x).utc_iso(), "\t",
-                ts.tt_jd(jd_b).utc_iso(), "\t",
-                y_a, y_x, y_b
-            )"""
-
-            dydt_a = (y_x - y_a) / (jd_x - jd_a)
-            dydt_b = (y_b - y_x) / (jd_b - jd_x)
-
-        if abs(dydt_a + dydt_b) / 2 < epsilon:
-            founds.append((
-                (ts.tt_jd(jd_a), ts.tt_jd(jd_x), ts.tt_jd(jd_b)),
-                (y_a, y_x, y_b)
-            ))
-        #else:
-            #print(dydt_a, dydt_b)
+    for i in np.flatnonzero(accepted):
+        founds.append((
+            (ts.tt_jd(jd_a[i]), ts.tt_jd(jd_x[i]), ts.tt_jd(jd_b[i])),
+            (y_a[i], y_x[i], y_b[i])
+        ))
+
+    return report.finish(founds)
+
+
+
+def refine_critical_points(
+    ts, f, jd_a, jd_x, jd_b, y_a, y_x, y_b,
+    epsilon=1e-4,
+    method="bisect",
+    report=None
+):
+    """Narrow down a series of triples jd_a < jd_x < jd_b (TT julian days),
+    each suspected to enclose a critical point, until all of them are
+    narrower than epsilon.
+
+    Each step halves every open triple by evaluating f at both quarter
+    points x1 and x2, and keeps the half where f is not monotonic:
+
+        a --- x1 --- x --- x2 --- b
+
+    All open triples are advanced together, with a single Time array holding
+    every x1 and x2 and one call to f(t, i), where i holds the indexes of
+    the triples being evaluated.
+
+    With method="parabolic", see _parabolic_critical_points instead.
+
+    Returns (jd_a, jd_x, jd_b, y_a, y_x, y_b) of the final triples. The
+    number of steps taken by each triple is recorded into report, if given.
+    """
+    jd_a, jd_x, jd_b = [np.array(e, dtype=float) for e in (jd_a, jd_x, jd_b)]
+    y_a, y_x, y_b = [np.array(e, dtype=float) for e in (y_a, y_x, y_b)]
+    steps = np.zeros(len(jd_a), dtype=int)
+
+    if method == "parabolic":
+        refined = _parabolic_critical_points(
+            ts, f, jd_a, jd_x, jd_b, y_a, y_x, y_b, epsilon, steps)
+    elif method == "bisect":
+        refined = _bisect_critical_points(
+            ts, f, jd_a, jd_x, jd_b, y_a, y_x, y_b, epsilon, steps)
+    else:
+        raise ValueError("Unknown method for critical points: %s" % method)
+
+    if report is not None:
+        report.record(steps)
+    return refined
+
+
+def _bisect_critical_points(ts, f, jd_a, jd_x, jd_b, y_a, y_x, y_b, epsilon,
+    steps):
+    active = np.flatnonzero(np.abs(jd_b - jd_a) > epsilon)
+    while len(active) > 0:
+        steps[active] += 1
+        n = len(active)
+        jd_x1 = (jd_a[active] + jd_x[active]) / 2
+        jd_x2 = (jd_x[active] + jd_b[active]) / 2
+        y_x12 = f(
+            ts.tt_jd(np.concatenate((jd_x1, jd_x2))),
+            np.concatenate((active, active))
+        )
+        y_x1, y_x2 = y_x12[:n], y_x12[n:]
+
+        # a --- x1 --- x --- x2 --- b
+
+        first = (y_x1 - y_a[active]) * (y_x[active] - y_x1) < 0
+        middle = ~first & ((y_x[active] - y_x1) * (y_x2 - y_x[active]) < 0)
+        last = ~first & ~middle
+
+        i = active[first]
+        jd_b[i], y_b[i] = jd_x[i], y_x[i]
+        jd_x[i], y_x[i] = jd_x1[first], y_x1[first]
+
+        i = active[middle]
+        jd_a[i], y_a[i] = jd_x1[middle], y_x1[middle]
+        jd_b[i], y_b[i] = jd_x2[middle], y_x2[middle]
+
+        i = active[last]
+        jd_a[i], y_a[i] = jd_x[i], y_x[i]
+        jd_x[i], y_x[i] = jd_x2[last], y_x2[last]
+
+        active = active[np.abs(jd_b[active] - jd_a[active]) > epsilon]
+
+    return jd_a, jd_x, jd_b, y_a, y_x, y_b
+
+
+def _parabolic_critical_points(ts, f, jd_a, jd_x, jd_b, y_a, y_x, y_b, epsilon,
+    steps):
+    """Brent-style minimization of all triples at once.
+
+    A maximum is searched as the minimum of -f, so that each triple always
+    holds g(x) <= g(a), g(b) with g = sign * f. The next point u is the
+    vertex of the parabola through a, x and b. It is kept at least
+    epsilon/3 away from a, b and x, so that the triple also shrinks from the
+    far side once x has converged. A triple that fails to halve in 3 steps
+    in a row has its larger half bisected once instead.
+    """
+    sign = np.where((y_x < y_a) | (y_x < y_b), 1.0, -1.0)
+    g_a, g_x, g_b = sign * y_a, sign * y_x, sign * y_b
+    h = epsilon / 3
+    slow = np.zeros(len(jd_a), dtype=int) # steps in a row not halving
+
+    active = np.flatnonzero(np.abs(jd_b - jd_a) > epsilon)
+    while len(active) > 0:
+        steps[active] += 1
+        a, x, b = jd_a[active], jd_x[active], jd_b[active]
+        ga, gx, gb = g_a[active], g_x[active], g_b[active]
+        width = b - a
+
+        p = (x - a)**2 * (gx - gb) - (x - b)**2 * (gx - ga)
+        q = 2 * ((x - a) * (gx - gb) - (x - b) * (gx - ga))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            u = x - p / q
+
+        larger = np.where(b - x > x - a, 1.0, -1.0)
+        bisect = (slow[active] >= 3) | ~np.isfinite(u) | (u <= a) | (u >= b)
+        u[bisect] = np.where(
+            larger > 0, (x + b) / 2, (a + x) / 2)[bisect]
+        near = np.abs(u - x) < h
+        u[near] = (x + larger * h)[near]
+        u = np.clip(u, a + h, b - h)
+
+        gu = sign[active] * f(ts.tt_jd(u), active)
+
+        # a --- u --- x --- b   or   a --- x --- u --- b
+        better = gu < gx
+        left = u < x
+        i = active[better & left]
+        jd_b[i], g_b[i] = jd_x[i], g_x[i]
+        i = active[better & ~left]
+        jd_a[i], g_a[i] = jd_x[i], g_x[i]
+        i = active[better]
+        jd_x[i], g_x[i] = u[better], gu[better]
+        i = active[~better & left]
+        jd_a[i], g_a[i] = u[~better & left], gu[~better & left]
+        i = active[~better & ~left]
+        jd_b[i], g_b[i] = u[~better & ~left], gu[~better & ~left]
+
+        halved = jd_b[active] - jd_a[active] <= width / 2
+        slow[active] = np.where(halved | bisect, 0, slow[active] + 1)
+        active = active[np.abs(jd_b[active] - jd_a[active]) > epsilon]
+
+    return jd_a, jd_x, jd_b, sign * g_a, sign * g_x, sign * g_b
 
-    return founds
 
 
 
@@ -109,6 +336,7 @@ def root_finder(
     start_time, end_time, f,
     num=12,
     epsilon=1e-6,      # in julian days
+    method="bisect"
 ):
     """Given f(t) as a function of time, find out it's continuous zero-points.
 
@@ -118,13 +346,31 @@ def root_finder(
     with different signs. This indicates a possible zero point between
         time_i and time_i+1
 
-    Having located the boundaries, a bisection method is applied to reduce the
-    above section to [time_a, time_b] where
-        time_b-time_a < epsilon1
-    indicates a sufficiently small time interval. This however doesn't
-    necessarily results a zero point, since we require continuation, there
-    must be also
-        abs( f(time_b) - f(time_a) ) < epsilon2
+    Having located the boundaries, each section is reduced to [time_a,
+    time_b] where
+        time_b - time_a < epsilon
+    indicates a sufficiently small time interval; epsilon is therefore the
+    tolerance of the zero-points returned, in days. All sections are reduced
+    together (see refine_roots), so that f is called once per step with an
+    array of times, instead of once per step and per section. A value
+        abs( f(time_i) ) < epsilon * (max(f) - min(f))
+    over the series is taken as a zero-point as it is.
+
+    method selects how sections are reduced: "bisect" halves them at each
+    step, converging linearly in log2(f.rough_period / num / epsilon) steps
+    whatever f is. "illinois" uses a safeguarded false position instead (see
+    _illinois_roots), which converges superlinearly and needs far fewer
+    steps for a smooth f, falls back to bisection where it does not, and
+    still ends with [time_a, time_b] narrower than epsilon. With "chebyshev",
+    num is not used and the possible zero-points are the roots of a
+    ChebyshevProxy of f, each polished by one secant step over epsilon on f
+    (see _chebyshev_roots), so that they are off by less than epsilon too.
+    "parabolic" only applies to critical points (see critical_point_finder),
+    and any other method raises ValueError.
+
+    A zero-point of the sections however doesn't necessarily result, since
+    we require continuation, there must be also
+        abs( f(time_b) - f(time_a) ) < epsilon * (max(f) - min(f))
 
     In calculating e.g. moon conjunctions with given star, we desire finding
         RA(moon) == RA(star)
@@ -146,6 +392,8 @@ def root_finder(
          x: a real conjunction result
          o: a fake conjunction due to non-continuation
 
+    The evaluations of f spent by each call are kept as a FinderReport in
+    the list of start_reports(), if started by this thread.
     """
 
 
@@ -154,48 +402,239 @@ def root_finder(
     ts = start_time.ts
     assert jd0 < jd1
 
+    report = FinderReport(
+        "root_finder", f, method, start_time, end_time, epsilon)
+    collect_report(report)
+    f = report.wrap(f)
+
+    if method == "chebyshev":
+        return report.finish(_chebyshev_roots(
+            start_time, end_time, f, epsilon, report))
+
     periods = (jd1 - jd0) / f.rough_period
     if periods < 1.0:
         periods = 1.0
 
-    jd = np.linspace(jd0, jd1, periods * num // 1.0)
+    jd = np.linspace(jd0, jd1, int(periods * num // 1.0))
 
     ts_n = ts.tt_jd(jd)
     y_n = f(ts_n)
 
     yrange = np.amax(y_n) - np.amin(y_n)
 
-    founds = []
+    y_i0, y_i1 = y_n[:-1], y_n[1:]
+    zeros = np.abs(y_i0) < epsilon * yrange # almost zero, treat as zero
+    brackets = np.flatnonzero(~zeros & (y_i0 * y_i1 <= 0))
 
-    for i in range(0, len(ts_n)-1):
-        ts_i0, y_i0 = ts_n[i], y_n[i]
-        ts_i1, y_i1 = ts_n[i+1], y_n[i+1]
+    # find between ts_i0 and ts_i1, for all brackets at once
+    jd_x, y_x, y_a, y_b = refine_roots(
+        ts, lambda t, i: f(t),
+        jd[brackets], jd[brackets+1], y_i0[brackets], y_i1[brackets],
+        epsilon=epsilon, method=method, report=report
+    )
+    continuous = np.abs(y_a - y_b) < epsilon * yrange
+    report.brackets += len(brackets)
+    report.rejected += int(np.sum(~continuous))
 
-        if abs(y_i0) < epsilon * yrange: # almost zero, treat as zero
-            founds.append((ts_i0, y_n[ts_i0]))
-            continue
-        if y_i0 * y_i1 > 0: continue # same sign, continue
-
-        # find between ts_i0 and ts_i1
-        jd_a, jd_b = ts_i0.tt, ts_i1.tt
-        y_a, y_b = y_i0, y_i1
-        
-        while jd_b - jd_a > epsilon:
-            jd_x = (jd_a + jd_b) / 2
-            ts_x = ts.tt_jd(jd_x)
-            y_x = f(ts_x)
-
-            if y_x * y_a < 0:
-                y_b = y_x
-                jd_b = jd_x
-            else:
-                y_a = y_x
-                jd_a = jd_x
+    founds = [(jd[i], y_n[i]) for i in np.flatnonzero(zeros)]
+    founds += list(zip(jd_x[continuous], y_x[continuous]))
+    founds.sort(key=lambda found: found[0])
+
+    return report.finish([(ts.tt_jd(jd_i), y_i) for jd_i, y_i in founds])
+
+
+
+def stacked_root_finder(
+    start_time, end_time, f, count,
+    num=12,
+    epsilon=1e-6,      # in julian days
+    method="bisect"
+):
+    """Find the continuous zero-points of count functions of time at once,
+    as root_finder would for each of them, given f(t, k) evaluating the
+    k-th of them.
+
+    f is sampled with a single call over the series of time of root_finder,
+    with k = np.arange(count)[:, np.newaxis]. It shall broadcast t against k
+    and return values of shape (count, len(t)). The brackets of all
+    functions are then refined together by refine_roots, calling f(t, k)
+    with k holding the function of each bracket. f can thereby compute what
+    the functions have in common once per time for all of them, e.g. the
+    position of the moon when searching for its conjunctions with several
+    bodies.
+
+    Zero-points are told from jumps for each function on its own range of
+    values, as in root_finder. Returns a list of [(time, value), ...] in
+    order of time for each function.
+    """
+
+    jd1 = end_time.tt
+    jd0 = start_time.tt
+    ts = start_time.ts
+    assert jd0 < jd1
+
+    report = FinderReport(
+        "stacked_root_finder", f, method, start_time, end_time, epsilon)
+    collect_report(report)
+    f = report.wrap(f)
+
+    periods = (jd1 - jd0) / f.rough_period
+    if periods < 1.0:
+        periods = 1.0
+
+    jd = np.linspace(jd0, jd1, int(periods * num // 1.0))
+    y_n = f(ts.tt_jd(jd), np.arange(count)[:, np.newaxis])
+
+    yrange = np.amax(y_n, axis=1) - np.amin(y_n, axis=1)
+
+    y_i0, y_i1 = y_n[:, :-1], y_n[:, 1:]
+    zeros = np.abs(y_i0) < epsilon * yrange[:, np.newaxis]
+    series, brackets = np.nonzero(~zeros & (y_i0 * y_i1 <= 0))
+
+    jd_x, y_x, y_a, y_b = refine_roots(
+        ts, lambda t, i: f(t, series[i]),
+        jd[brackets], jd[brackets+1],
+        y_i0[series, brackets], y_i1[series, brackets],
+        epsilon=epsilon, method=method, report=report
+    )
+    continuous = np.abs(y_a - y_b) < epsilon * yrange[series]
+    report.brackets += len(brackets)
+    report.rejected += int(np.sum(~continuous))
+
+    founds = [[] for k in range(count)]
+    for k, i in zip(*np.nonzero(zeros)):
+        founds[k].append((jd[i], y_n[k, i]))
+    for k, jd_i, y_i in zip(
+        series[continuous], jd_x[continuous], y_x[continuous]
+    ):
+        founds[k].append((jd_i, y_i))
+
+    return report.finish([
+        [
+            (ts.tt_jd(jd_i), y_i)
+            for jd_i, y_i in sorted(found, key=lambda found: found[0])
+        ]
+        for found in founds
+    ])
+
+
+
+def refine_roots(ts, f, jd_a, jd_b, y_a, y_b, epsilon=1e-6, method="bisect",
+    report=None):
+    """Bisect a series of brackets [jd_a, jd_b] (TT julian days), each with
+    f(jd_a) and f(jd_b) of different signs, until all of them are narrower
+    than epsilon.
 
-        if abs(y_a - y_b) < epsilon * yrange:
-            founds.append((ts_x, y_x))
+    Instead of one bisection loop per bracket, all open brackets are advanced
+    together: each step builds a single Time array of their midpoints and
+    calls f(t, i) once, where i holds the indexes of the brackets being
+    evaluated. This allows f to differ from bracket to bracket, e.g. when
+    searching for several targets or levels in one go.
+
+    With method="illinois", see _illinois_roots instead.
+
+    Returns (jd_x, y_x, y_a, y_b), the last midpoints with their values and
+    the values at both ends of the final brackets. The number of steps taken
+    by each bracket is recorded into report, if given.
+    """
+    jd_a = np.array(jd_a, dtype=float)
+    jd_b = np.array(jd_b, dtype=float)
+    y_a = np.array(y_a, dtype=float)
+    y_b = np.array(y_b, dtype=float)
+    jd_x, y_x = jd_a.copy(), y_a.copy()
+    steps = np.zeros(len(jd_a), dtype=int)
+
+    if method == "illinois":
+        refined = _illinois_roots(
+            ts, f, jd_a, jd_b, y_a, y_b, jd_x, y_x, epsilon, steps)
+    elif method == "bisect":
+        refined = _bisect_roots(
+            ts, f, jd_a, jd_b, y_a, y_b, jd_x, y_x, epsilon, steps)
+    else:
+        raise ValueError("Unknown method for roots: %s" % method)
+
+    if report is not None:
+        report.record(steps)
+    return refined
+
+
+def _bisect_roots(ts, f, jd_a, jd_b, y_a, y_b, jd_x, y_x, epsilon, steps):
+    active = np.flatnonzero(jd_b - jd_a > epsilon)
+    while len(active) > 0:
+        steps[active] += 1
+        jd_x[active] = (jd_a[active] + jd_b[active]) / 2
+        y_x[active] = f(ts.tt_jd(jd_x[active]), active)
+
+        left = y_x[active] * y_a[active] < 0
+        right, left = active[~left], active[left]
+        jd_b[left], y_b[left] = jd_x[left], y_x[left]
+        jd_a[right], y_a[right] = jd_x[right], y_x[right]
+
+        active = active[jd_b[active] - jd_a[active] > epsilon]
+
+    return jd_x, y_x, y_a, y_b
+
+
+def _illinois_roots(ts, f, jd_a, jd_b, y_a, y_b, jd_x, y_x, epsilon, steps):
+    """False position (regula falsi) on all brackets at once, with the
+    Illinois modification: when the same end of a bracket is kept twice in a
+    row, its value is halved for the next interpolation, so that both ends
+    keep moving towards the root.
+
+    The interpolated point is kept at least epsilon/2 inside the bracket.
+    Once it has converged next to one end, the sign change therefore moves
+    the other end as well, and the bracket ends up narrower than epsilon
+    just as with bisection.
+
+    Whenever a step fails to halve the smaller of abs(f) at both ends, the
+    next step is a plain bisection. This bounds the worst case for an
+    ill-behaving f, and in particular for a jump of RA from 24h to 0h, where
+    abs(f) never gets small and false position gains nothing.
+    """
+    w_a, w_b = y_a.copy(), y_b.copy() # values used for interpolation
+    kept = np.zeros(len(jd_a)) # -1: a was kept last time, +1: b was kept
+    slow = np.zeros(len(jd_a), dtype=bool) # last step failed
+    h = epsilon / 2
+
+    active = np.flatnonzero(jd_b - jd_a > epsilon)
+    while len(active) > 0:
+        steps[active] += 1
+        a, b = jd_a[active], jd_b[active]
+        best = np.minimum(np.abs(y_a[active]), np.abs(y_b[active]))
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x = b - w_b[active] * (b - a) / (w_b[active] - w_a[active])
+        bisect = slow[active] | ~np.isfinite(x)
+        x[bisect] = ((a + b) / 2)[bisect]
+        x = np.clip(x, a + h, b - h)
+
+        jd_x[active] = x
+        y_x[active] = f(ts.tt_jd(x), active)
+
+        left = y_x[active] * y_a[active] < 0
+        exact = y_x[active] == 0
+        right, left = active[~left & ~exact], active[left]
+
+        jd_b[left], y_b[left], w_b[left] = jd_x[left], y_x[left], y_x[left]
+        halve = left[kept[left] < 0]
+        w_a[halve] /= 2
+        kept[left] = -1
+
+        jd_a[right], y_a[right], w_a[right] = \
+            jd_x[right], y_x[right], y_x[right]
+        halve = right[kept[right] > 0]
+        w_b[halve] /= 2
+        kept[right] = 1
+
+        exact = active[exact]
+        jd_a[exact], jd_b[exact] = jd_x[exact], jd_x[exact]
+        y_a[exact], y_b[exact] = 0, 0
+
+        slow[active] = np.abs(y_x[active]) > best / 2
+        active = active[jd_b[active] - jd_a[active] > epsilon]
+
+    return jd_x, y_x, y_a, y_b
 
-    return founds 
 
             
 
@@ -203,14 +642,414 @@ def root_finder(
     
 
 
+def level_crossing_finder(
+    start_time, end_time, f, levels,
+    num=12,
+    epsilon=1e-6,      # in julian days
+    method="bisect"
+):
+    """Given f(t) as a function of time, find out where it crosses each of
+    the given levels.
+
+    f(times) is calculated only once over a series of time from
+    [start_time, end_time], exactly as in root_finder. Each level is then
+    bracketed on these shared values, and the brackets of all levels are
+    refined together by refine_roots, with f(t) - level evaluated for each
+    bracket. Compared to one root_finder per level, this saves the sampling
+    of f for all levels but one, e.g. when searching for sunrise, civil and
+    astronomical twilight on the same altitude of the sun.
+
+    As in root_finder, crossings due to a jump of f are dropped. Since f may
+    change fast against its range, e.g. the altitude of the sun, a crossing
+    is taken as a jump when the change of f over the final bracket is not
+    far smaller than over the sampled one.
+    Returns a list of
+        (time, level, direction)
+    in order of time, with level being one of the given levels and direction being +1 where f rises above level,
+    and -1 where it falls below.
+    """
+
+    jd1 = end_time.tt
+    jd0 = start_time.tt
+    ts = start_time.ts
+    assert jd0 < jd1
+
+    report = FinderReport(
+        "level_crossing_finder", f, method, start_time, end_time, epsilon)
+    collect_report(report)
+    f = report.wrap(f)
+
+    periods = (jd1 - jd0) / f.rough_period
+    if periods < 1.0:
+        periods = 1.0
+
+    jd = np.linspace(jd0, jd1, int(periods * num // 1.0))
+    y_n = f(ts.tt_jd(jd))
+
+    level_n = np.asarray(levels, dtype=float)
+    above = y_n[np.newaxis, :] > level_n[:, np.newaxis]
+    level_i, brackets = np.nonzero(above[:, :-1] != above[:, 1:])
+    level_y = level_n[level_i]
+
+    jd_x, y_x, y_a, y_b = refine_roots(
+        ts, lambda t, i: f(t) - level_y[i],
+        jd[brackets], jd[brackets+1],
+        y_n[brackets] - level_y, y_n[brackets+1] - level_y,
+        epsilon=epsilon, method=method, report=report
+    )
+    # a jump keeps its height however narrow the bracket gets
+    sampled = np.abs(y_n[brackets+1] - y_n[brackets])
+    continuous = np.abs(y_a - y_b) < sampled / 2
+    report.brackets += len(brackets)
+    report.rejected += int(np.sum(~continuous))
+
+    direction = np.where(above[level_i, brackets+1], 1, -1)
+    founds = sorted(zip(
+        jd_x[continuous], level_i[continuous], direction[continuous]))
+
+    return report.finish([
+        (ts.tt_jd(jd_i), levels[i], int(d)) for jd_i, i, d in founds])
+
+
+
+def _evaluate(ts, f, jd):
+    # Skyfield refuses to observe at an empty Time array
+    if len(jd) == 0:
+        return np.zeros(0)
+    return f(ts.tt_jd(jd))
+
+
+
+# Tolerance of the roots of a piece at its edges, in units of half the
+# piece. Roots from the eigenvalues of a colleague matrix, with the tail of
+# the coefficients trimmed at the tolerance of the fit, are off by up to
+# some 1e-8 there.
+EDGE = 1e-6
+
+
+class ChebyshevProxy:
+
+    """Piecewise Chebyshev approximation of f(t) over [start_time, end_time].
+
+    The span is cut into pieces of rough_period, and jd holds the Chebyshev
+    points of all pieces, one column per piece. Once fitted to the values of
+    f at all of them, which are best evaluated with a single Time array,
+    roots of each piece are the eigenvalues of its colleague matrix, and its
+    extrema the roots of its derivative, so that no further evaluation of f
+    is needed to locate them.
+
+    A piece whose last coefficients are not negligible against the range of
+    f is not resolved by the polynomial, e.g. because of a jump of RA from
+    24h to 0h. Such pieces are reported by unresolved(), and shall be
+    searched on their samples instead.
+    """
+
+    def __init__(self, start_time, end_time, rough_period, degree=32):
+        jd0, jd1 = start_time.tt, end_time.tt
+        count = int(np.ceil((jd1 - jd0) / rough_period))
+        edges = np.linspace(jd0, jd1, count + 1)
+
+        self.ts = start_time.ts
+        self.degree = degree
+        self.middle = (edges[:-1] + edges[1:]) / 2
+        self.half = (edges[1:] - edges[:-1]) / 2
+        self.x = np.polynomial.chebyshev.chebpts2(degree + 1) # -1 ... 1
+
+        # jd: one column of Chebyshev points per piece
+        self.jd = self.middle + np.outer(self.x, self.half)
+
+    def fit(self, y, tolerance=1e-8):
+        """Fit the pieces to y, the values of f at jd."""
+        self.y = np.reshape(y, self.jd.shape)
+        self.yrange = np.amax(self.y) - np.amin(self.y)
+
+        self.coefficients = np.polynomial.chebyshev.chebfit(
+            self.x, self.y, self.degree)
+        self.tolerance = tolerance * self.yrange
+        tail = np.amax(np.abs(self.coefficients[-3:]), axis=0)
+        self.resolved = tail <= self.tolerance
+        return self
+
+    def _solve(self, derivative, merge):
+        founds = []
+        for i in np.flatnonzero(self.resolved):
+            piece = np.polynomial.Chebyshev(self.coefficients[:, i])
+            piece = piece.deriv(derivative).trim(self.tolerance)
+            if piece.degree() < 1: continue
+            x = piece.roots()
+            x = x[np.abs(x.imag) < 1e-9].real
+            # the eigenvalues of a root on an edge of the piece may come out
+            # slightly outside, on either or both of the pieces sharing it
+            x = np.clip(x[np.abs(x) <= 1 + EDGE], -1, 1)
+            founds.append(self.middle[i] + self.half[i] * x)
+        jd = np.sort(np.concatenate(founds)) if founds else np.array([])
+        if len(jd) == 0:
+            return jd
+
+        # those found on both sides of an edge are taken once
+        merge = max(merge, EDGE * np.amax(self.half))
+        return jd[np.concatenate(([True], np.diff(jd) > merge))]
+
+    def roots(self, merge=0.0):
+        """TT julian days of the roots of all resolved pieces, those closer
+        than merge days to the one before taken once."""
+        return self._solve(0, merge)
+
+    def extrema(self, merge=0.0):
+        """TT julian days of the extrema of all resolved pieces, those
+        closer than merge days to the one before taken once."""
+        return self._solve(1, merge)
+
+    def spacing(self):
+        """Largest distance between two neighbouring Chebyshev points."""
+        return np.amax(self.half) * np.amax(np.diff(self.x))
+
+    def unresolved(self):
+        """(jd, y) of the samples of each unresolved piece, in time order."""
+        return [
+            (self.jd[:, i], self.y[:, i])
+            for i in np.flatnonzero(~self.resolved)
+        ]
+
+
+
+def stacked_chebyshev_finder(start_time, end_time, f, searches):
+    """Search count functions of time at once, given f(t, k) evaluating the
+    k-th of them, the way root_finder or critical_point_finder with
+    method="chebyshev" would search each of them.
+
+    searches holds a (kind, rough_period, epsilon) for each function, kind
+    being "roots" or "critical_points". Returns a list for each of them, of
+    what root_finder or critical_point_finder would have returned.
+
+    As with stacked_root_finder, f is called with k =
+    np.arange(count)[:, np.newaxis] to sample all functions at the same
+    times, and with k holding the function of each time otherwise. Each
+    stage of the search, from sampling the proxies to refining their
+    roots and extrema, calls f only once for all functions. f can thereby
+    compute what the functions have in common once per time, e.g. the
+    position of the moon for its distance, latitude and declination.
+    """
+    report = FinderReport(
+        "stacked_chebyshev_finder", f, "chebyshev", start_time, end_time,
+        min(epsilon for _, _, epsilon in searches))
+    collect_report(report)
+    f = report.wrap(f)
+
+    return report.finish(
+        _chebyshev_search(start_time, end_time, f, searches, report))
+
+
+def _chebyshev_roots(start_time, end_time, f, epsilon, report):
+    """root_finder(method="chebyshev")
+
+    Each root r of the proxy is polished with one secant step on the real
+    f: f is evaluated at r-epsilon/2 and r+epsilon/2 for all roots at once.
+    The value returned with such a root is the secant interpolation, i.e. 0.
+    Roots where f does not change its sign between both points, as well as
+    sign changes among the samples of unresolved pieces, are refined by
+    refine_roots instead.
+    """
+    return _chebyshev_search(
+        start_time, end_time, lambda t, k: f(t),
+        [("roots", f.rough_period, epsilon)], report
+    )[0]
+
+
+def _chebyshev_critical_points(start_time, end_time, f, epsilon, report):
+    """critical_point_finder(method="chebyshev")
+
+    For each extremum c of the proxy, f is evaluated at c-h, c and c+h for
+    all extrema at once, with h being epsilon/2 or half the spacing of the
+    Chebyshev points, whichever smaller. Where these values are monotonic,
+    the proxy was too far off. Such extrema, as well as suspects among the
+    samples of unresolved pieces, are narrowed down by
+    refine_critical_points instead.
+    """
+    return _chebyshev_search(
+        start_time, end_time, lambda t, k: f(t),
+        [("critical_points", f.rough_period, epsilon)], report
+    )[0]
+
+
+def _chebyshev_search(start_time, end_time, f, searches, report):
+    # see stacked_chebyshev_finder, _chebyshev_roots and
+    # _chebyshev_critical_points
+    ts = start_time.ts
+    count = len(searches)
+    kinds = [kind for kind, _, _ in searches]
+    for kind in kinds:
+        if kind not in ("roots", "critical_points"):
+            raise ValueError("Unknown search: %s" % kind)
+
+    def evaluate(requests):
+        # f at the TT julian days requested by each search, in one call
+        sizes = [len(jd) for jd in requests]
+        k = np.repeat(np.arange(count), sizes)
+        y = _evaluate(ts, lambda t: f(t, k), np.concatenate(requests))
+        return np.split(y, np.cumsum(sizes)[:-1])
+
+    # 1. sample all proxies at once; those of the same rough_period share
+    # their Chebyshev points
+    proxies = [
+        ChebyshevProxy(start_time, end_time, rough_period)
+        for _, rough_period, _ in searches]
+    offsets = np.cumsum([0] + [proxy.jd.size for proxy in proxies])
+    jd, inverse = np.unique(
+        np.concatenate([proxy.jd.ravel() for proxy in proxies]),
+        return_inverse=True)
+    y = np.broadcast_to(
+        f(ts.tt_jd(jd), np.arange(count)[:, np.newaxis]), (count, len(jd)))
+    for k, proxy in enumerate(proxies):
+        proxy.fit(y[k, inverse[offsets[k]:offsets[k+1]]])
+
+    # 2. polish the roots and extrema of the proxies on the real f
+    centers, points = [], []
+    for (kind, _, epsilon), proxy in zip(searches, proxies):
+        if kind == "roots":
+            r, h = proxy.roots(epsilon), epsilon / 2
+            points.append((r - h, r + h))
+        else:
+            r = proxy.extrema(epsilon)
+            h = min(epsilon, proxy.spacing()) / 2
+            points.append((r - h, r, r + h))
+        centers.append((r, h))
+    values = evaluate([np.concatenate(p) for p in points])
+    values = [np.split(y, len(p)) for y, p in zip(values, points)]
+
+    founds, widened = [], []
+    for kind, (_, _, epsilon), proxy, (r, h), y in zip(
+        kinds, searches, proxies, centers, values
+    ):
+        if kind == "roots":
+            y_a, y_b = y
+            polished = y_a * y_b <= 0
+
+            with np.errstate(divide="ignore", invalid="ignore"):
+                jd_x = r - h + 2 * h * y_a / (y_a - y_b)
+            jd_x = np.where(np.isfinite(jd_x), jd_x, r)
+            continuous = polished & (
+                np.abs(y_a - y_b) < epsilon * proxy.yrange)
+            founds.append([(jd_i, 0.0) for jd_i in jd_x[continuous]])
+            report.brackets += int(np.sum(polished))
+            report.rejected += int(np.sum(polished & ~continuous))
+            report.record(np.ones(np.sum(polished)))
+
+            # bracket the roots the proxy failed to locate within epsilon/2
+            d = proxy.spacing()
+            widened.append((
+                np.maximum(r[~polished] - d, start_time.tt),
+                np.minimum(r[~polished] + d, end_time.tt),
+            ))
+        else:
+            y_a, y_x, y_b = y
+            polished = (y_x - y_a) * (y_b - y_x) <= 0
+            founds.append(
+                [e[polished] for e in (r - h, r, r + h, y_a, y_x, y_b)])
+            report.record(np.ones(np.sum(polished)))
+
+            # widen the extrema the proxy failed to locate within h
+            jd_x = r[~polished]
+            d = proxy.spacing()
+            widened.append((
+                np.maximum(jd_x - d, (start_time.tt + jd_x) / 2),
+                jd_x,
+                np.minimum(jd_x + d, (end_time.tt + jd_x) / 2),
+                y_x[~polished],
+            ))
+    values = evaluate([
+        np.concatenate((w[0], w[1] if kind == "roots" else w[2]))
+        for kind, w in zip(kinds, widened)])
+
+    # 3. collect what is left to refine, together with the sign changes or
+    # suspects among the samples of unresolved pieces
+    pending = []
+    for kind, proxy, w, y in zip(kinds, proxies, widened, values):
+        y_a, y_b = y[:len(w[0])], y[len(w[0]):]
+        if kind == "roots":
+            brackets = [(w[0], w[1], y_a, y_b)]
+            for jd, y in proxy.unresolved():
+                brackets.append((jd[:-1], jd[1:], y[:-1], y[1:]))
+        else:
+            brackets = [(w[0], w[1], w[2], y_a, w[3], y_b)]
+            for jd, y in proxy.unresolved():
+                brackets.append(
+                    (jd[:-2], jd[1:-1], jd[2:], y[:-2], y[1:-1], y[2:]))
+        brackets = [
+            np.concatenate([np.asarray(e[n], dtype=float) for e in brackets])
+            for n in range(len(brackets[0]))]
+        if kind == "roots":
+            jd_a, jd_b, y_a, y_b = brackets
+            i = np.flatnonzero(y_a * y_b <= 0)
+        else:
+            jd_a, jd_x, jd_b, y_a, y_x, y_b = brackets
+            i = np.flatnonzero((y_x - y_a) * (y_b - y_x) <= 0)
+        pending.append([e[i] for e in brackets])
+
+    # 4. refine the searches of the same kind and epsilon together
+    refined = [None] * count
+    for kind, epsilon in sorted(set((s[0], s[2]) for s in searches)):
+        group = [
+            k for k in range(count)
+            if searches[k][0] == kind and searches[k][2] == epsilon]
+        series = np.repeat(group, [len(pending[k][0]) for k in group])
+        brackets = [
+            np.concatenate([pending[k][n] for k in group])
+            for n in range(len(pending[group[0]]))]
+        refine = refine_roots if kind == "roots" else refine_critical_points
+        results = refine(
+            ts, lambda t, i: f(t, series[i]), *brackets,
+            epsilon=epsilon,
+            method="illinois" if kind == "roots" else "parabolic",
+            report=report
+        )
+        for k in group:
+            refined[k] = [e[series == k] for e in results]
+
+    # 5. put together the founds of each search
+    results = []
+    for kind, (_, _, epsilon), proxy, found, r in zip(
+        kinds, searches, proxies, founds, refined
+    ):
+        if kind == "roots":
+            jd_x, y_x, y_a, y_b = r
+            continuous = np.abs(y_a - y_b) < epsilon * proxy.yrange
+            report.brackets += len(jd_x)
+            report.rejected += int(np.sum(~continuous))
+            found += list(zip(jd_x[continuous], y_x[continuous]))
+            found.sort(key=lambda found: found[0])
+            results.append([(ts.tt_jd(jd_i), y_i) for jd_i, y_i in found])
+            continue
+
+        jd_a, jd_x, jd_b, y_a, y_x, y_b = [
+            np.concatenate((e, e_r)) for e, e_r in zip(found, r)]
+        dydt_a = (y_x - y_a) / (jd_x - jd_a)
+        dydt_b = (y_b - y_x) / (jd_b - jd_x)
+        accepted = np.abs(dydt_a + dydt_b) / 2 < epsilon
+        report.brackets += len(accepted)
+        report.rejected += int(np.sum(~accepted))
+        results.append([
+            (
+                (ts.tt_jd(jd_a[i]), ts.tt_jd(jd_x[i]), ts.tt_jd(jd_b[i])),
+                (y_a[i], y_x[i], y_b[i])
+            )
+            for i in sorted(np.flatnonzero(accepted), key=lambda i: jd_x[i])
+        ])
+
+    return results
+
+
+
+
 if __name__ == "__main__":
     from _constants import *
+    from _nutation import applyNutation
 
     from _spheric_dist import spherical_distance
     planet = Mercury 
 
     def g(t):
-        t._nutation_angles = iau2000b(t.tt)
+        applyNutation(t)
         mLat, mLng = Earth.at(t).observe(planet).apparent().radec('date')[:2]
         sLat, sLng = Earth.at(t).observe(Sun).apparent().radec('date')[:2]
         return spherical_distance(
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+
+from skyfield import api
+
+from collections import namedtuple
+import csv
+
+
+# Latitudes of the tables of rise and set in the almanac, all at longitude 0.
+locations = [
+    (20,        api.Topos('20 N', '0 E')),
+    (30,        api.Topos('30 N', '0 E')),
+    (35,        api.Topos('35 N', '0 E')),
+    (40,        api.Topos('40 N', '0 E')),
+    (45,        api.Topos('45 N', '0 E')),
+    (50,        api.Topos('50 N', '0 E')),
+    (55,        api.Topos('55 N', '0 E')),
+]
+
+
+# A site of observation: latitude and longitude in degrees, north and east
+# positive, elevation in meters above sea level, and the name of its time
+# zone (e.g. "Asia/Shanghai"), or None for UTC.
+Site = namedtuple("Site", "name latitude longitude elevation timezone")
+
+
+def loadSites(path):
+    """Read a list of sites from a CSV file with one site per row:
+
+        name, latitude, longitude[, elevation[, timezone]]
+
+    Empty rows and those starting with # are skipped."""
+    sites = []
+    with open(path, "r", newline="") as f:
+        for row in csv.reader(f):
+            row = [e.strip() for e in row]
+            if not row or not row[0] or row[0].startswith("#"):
+                continue
+            if len(row) < 3:
+                raise ValueError("Site without coordinates: %s" % row)
+            name, latitude, longitude = row[:3]
+            elevation = float(row[3]) if len(row) > 3 and row[3] else 0.0
+            timezone = row[4] if len(row) > 4 and row[4] else None
+            sites.append(Site(
+                name, float(latitude), float(longitude), elevation, timezone))
+    return sites
+
+
+def chunksOf(sites, size):
+    """Split a list of sites into lists of at most size sites."""
+    for i in range(0, len(sites), size):
+        yield sites[i:i+size]
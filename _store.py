@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import sqlite3
+
+
+# An optional store for the results of many years in one SQLite database,
+# indexed by time and body. Questions across years, e.g. all conjunctions
+# of the moon with Spica from 2020 to 2030, or the sunsets at 40N in March,
+# are then answered by index lookups instead of loading or computing whole
+# years. The results of a year are put into the store from its caches by
+# store_calculations.py.
+#
+# All times are TT julian dates, as in the caches. The query helpers also
+# accept skyfield Times.
+
+STORE = os.path.join("calculations", "almanac.sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    year INTEGER NOT NULL,          -- of the almanac it was found for
+    time REAL NOT NULL,
+    type TEXT NOT NULL,             -- e.g. moon_conjunctions
+    body TEXT,                      -- e.g. Spica, NULL if none
+    parameters TEXT                 -- as JSON
+);
+CREATE INDEX IF NOT EXISTS events_time ON events (time);
+CREATE INDEX IF NOT EXISTS events_type ON events (type, body, time);
+
+CREATE TABLE IF NOT EXISTS positions (
+    year INTEGER NOT NULL,
+    time REAL NOT NULL,
+    body TEXT NOT NULL,
+    ra REAL NOT NULL,               -- apparent, of date, in hours
+    dec REAL NOT NULL,              -- in degrees
+    ecllon REAL NOT NULL            -- in degrees
+);
+CREATE INDEX IF NOT EXISTS positions_body ON positions (body, time);
+
+CREATE TABLE IF NOT EXISTS riseset (
+    year INTEGER NOT NULL,
+    time REAL NOT NULL,
+    body TEXT NOT NULL,
+    latitude REAL NOT NULL,         -- in degrees, north positive
+    longitude REAL NOT NULL,        -- in degrees, east positive
+    level REAL NOT NULL,            -- the altitude crossed, in degrees
+    direction INTEGER NOT NULL      -- +1 rising above it, -1 setting
+);
+CREATE INDEX IF NOT EXISTS riseset_body ON riseset (body, latitude, time);
+"""
+
+
+def _jd(t):
+    return float(getattr(t, "tt", t))
+
+
+class Store:
+
+    """The store in the SQLite database at path, created if missing.
+
+    addEvents, addPositions and addRiseSet replace all rows stored before
+    for a year, in one transaction. They take any iterable of rows, e.g. a
+    generator over the results of a finder, and insert them as they come,
+    without holding all of them in memory.
+
+    events, positions and riseSet give the rows of a time range, in order
+    of time.
+    """
+
+    def __init__(self, path=STORE):
+        self.connection = sqlite3.connect(path, timeout=60)
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def _replace(self, table, columns, year, rows):
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM %s WHERE year = ?" % table, (year,))
+            self.connection.executemany(
+                "INSERT INTO %s (year, %s) VALUES (?%s)" % (
+                    table, ", ".join(columns), ", ?" * len(columns)),
+                ((year,) + tuple(row) for row in rows)
+            )
+
+    def addEvents(self, year, rows):
+        """rows of (time, type, body or None, parameters as JSON)"""
+        self._replace("events", ["time", "type", "body", "parameters"],
+            year, rows)
+
+    def addPositions(self, year, rows):
+        """rows of (time, body, ra, dec, ecllon)"""
+        self._replace("positions", ["time", "body", "ra", "dec", "ecllon"],
+            year, rows)
+
+    def addRiseSet(self, year, rows):
+        """rows of (time, body, latitude, longitude, level, direction)"""
+        self._replace("riseset", [
+            "time", "body", "latitude", "longitude", "level", "direction"
+        ], year, rows)
+
+    def _select(self, sql, conditions, order="time"):
+        where = " AND ".join(
+            condition for condition, value in conditions if value is not None)
+        values = [value for _, value in conditions if value is not None]
+        return self.connection.execute(
+            "%s WHERE %s ORDER BY %s" % (sql, where, order), values)
+
+    def events(self, start, end, type=None, body=None):
+        """(time, type, body, parameters) of the events from start to end,
+        of the given type and body only if given."""
+        rows = self._select("SELECT time, type, body, parameters FROM events", [
+            ("time >= ?", _jd(start)),
+            ("time < ?", _jd(end)),
+            ("type = ?", type),
+            ("body = ?", body),
+        ])
+        for time, type, body, parameters in rows:
+            yield time, type, body, json.loads(parameters)
+
+    def positions(self, body, start, end):
+        """(time, ra, dec, ecllon) of body from start to end."""
+        return self._select("SELECT time, ra, dec, ecllon FROM positions", [
+            ("body = ?", body),
+            ("time >= ?", _jd(start)),
+            ("time < ?", _jd(end)),
+        ])
+
+    def riseSet(self, body, latitude, start, end, level=None, direction=None,
+        longitude=0.0
+    ):
+        """(time, level, direction) of the crossings of body at the given
+        site from start to end, of the given level and direction only if
+        given."""
+        return self._select(
+            "SELECT time, level, direction FROM riseset", [
+                ("body = ?", body),
+                ("latitude = ?", float(latitude)),
+                ("longitude = ?", float(longitude)),
+                ("time >= ?", _jd(start)),
+                ("time < ?", _jd(end)),
+                ("level = ?", level),
+                ("direction = ?", direction),
+            ]
+        )
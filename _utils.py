@@ -1,8 +1,32 @@
 #!/usr/bin/env python3
 
+import numpy as np
 from skyfield.timelib import Time
 
+from _calendar import listDates
+
 def roundTimeToMinute(t):
     return t # fix me
     assert isinstance(t, Time)
     return Time(tt=round(t.tt * 1440) / 1440.0)
+
+
+def utcStrftime(timescale, jd, format):
+    """Format TT julian dates as t.utc_strftime(format) would. Returns a
+    list, or a single string for a single date, with None for NaN."""
+    jd = np.asarray(jd, dtype=float)
+    known = np.isfinite(jd)
+    strings = np.full(jd.shape, None, dtype=object)
+    if np.any(known):
+        strings[known] = timescale.tt_jd(np.atleast_1d(jd[known]))\
+            .utc_strftime(format)
+    return strings.tolist()
+
+
+def utcDayOfYear(timescale, jd, year):
+    """Index into listDates(year) of the UTC day of each TT julian date, as
+    formatted by utcStrftime, or -1 for a date outside of the year."""
+    days = {"%04d-%02d-%02d" % ymd: i for i, ymd in enumerate(listDates(year))}
+    dates = utcStrftime(timescale, np.ravel(jd), "%Y-%m-%d")
+    index = [days.get(date, -1) for date in dates]
+    return np.array(index, dtype=int).reshape(np.shape(jd))
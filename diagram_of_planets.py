@@ -9,6 +9,7 @@ from skyfield.earthlib import sidereal_time
 
 from _utils import roundTimeToMinute
 from _constants import *
+from _ephemeris import StackedEphemeris
 from _rootfinder import  root_finder, critical_point_finder
 from _spheric_dist import spherical_distance
 
@@ -52,6 +53,10 @@ class DiagramOfPlanets:
         endtime   = timescale.utc(*endYearMonth, 1, 0, 0, 0)
 
         self.timerange = (starttime, endtime)
+
+        # files exchanged with gnuplot, unique for years built in parallel
+        temp = "temp-%d-%d-%d" % (year, month, os.getpid())
+        self.svgFile, self.dataFile = temp + ".svg", temp + ".dat"
         #self.months = [monthShifter + i for i in range(-extension, extension+2)]
 
         self._calc()
@@ -62,13 +67,16 @@ class DiagramOfPlanets:
             self.timerange[0].tt, self.timerange[1].tt, ceil(days))
         ts_n = timescale.tt_jd(jd)
 
-        observe = lambda p: Earth.at(ts_n).observe(p).apparent().radec()[:2]
+        ra, dec, _ = StackedEphemeris(Earth, self.ALL_OBJECTS).radec(ts_n)
         self.data = {
             "ts_n":     ts_n,
             "sidereal": sidereal_time(ts_n),
         }
-        for each in self.ALL_OBJECTS:
-            self.data[each] = observe(each)
+        for i, each in enumerate(self.ALL_OBJECTS):
+            self.data[each] = (
+                Angle(radians=ra.radians[i], preference="hours"),
+                Angle(radians=dec.radians[i], signed=True),
+            )
 
     def _discontinuities(self, series, e=1):
         i = 0
@@ -85,7 +93,7 @@ class DiagramOfPlanets:
     def _setupGnuplot(self, width=580):
         gp.c("reset")
         gp.c("set term svg size %d,270" % width)
-        gp.c('set output "temp.svg"')
+        gp.c('set output "%s"' % self.svgFile)
 
         gp.c("""set ydata time""")
         gp.c("set timefmt \"%Y-%m-%dT%H:%M:%S\"")
@@ -110,7 +118,7 @@ class DiagramOfPlanets:
             data.append(decs)
 
         self._setupGnuplot(width=480)
-        gp.s(data)
+        gp.s(data, filename=self.dataFile)
 
         gp.c("set format x \"%02.0f\"")
 
@@ -125,18 +133,18 @@ class DiagramOfPlanets:
         #gp.c("""plot for[n=2:9] "tmp.dat" u n:1""")
 
         gp.c("plot " + ",".join([
-            '"tmp.dat" using %d:1 title "%s" enhanced with linespoints pi 30 ps 1 pt "%s" lt rgb "black" dt 1' % 
-            (i+2, self.ALL_OBJECTS_NAME[i], self.OBJECT_SYMBOLS[i])
+            '"%s" using %d:1 title "%s" enhanced with linespoints pi 30 ps 1 pt "%s" lt rgb "black" dt 1' % 
+            (self.dataFile, i+2, self.ALL_OBJECTS_NAME[i], self.OBJECT_SYMBOLS[i])
             for i in range(0, len(self.ALL_OBJECTS))
         ]))
 
         gp.c("unset output")
         while True:
             time.sleep(0.1)
-            ret = open("temp.svg", "r").read()
+            ret = open(self.svgFile, "r").read()
             if "</svg>" in ret: break 
-        os.unlink("temp.svg")
-        os.unlink("tmp.dat")
+        os.unlink(self.svgFile)
+        os.unlink(self.dataFile)
         return ret
 
 
@@ -179,7 +187,7 @@ class DiagramOfPlanets:
         self._setupGnuplot()
 
         gp.c('set datafile missing "?"')
-        gp.s(data)
+        gp.s(data, filename=self.dataFile)
 
 
         gp.c("set format x \"%02.0f\"")
@@ -194,22 +202,22 @@ class DiagramOfPlanets:
         #gp.c("""plot for[n=2:9] "tmp.dat" u n:1""")
 
         gp.c("plot " + ",".join([
-            '"tmp.dat" using ($%d):1 title "%dh" at end with lines  lc rgb "#FF6666" ' % 
-            (i + 10, i*2)
+            '"%s" using ($%d):1 title "%dh" at end with lines  lc rgb "#FF6666" ' % 
+            (self.dataFile, i + 10, i*2)
             for i in range(0, 13)
         ] + [
-            '"tmp.dat" using ($%d):1 title "%s" enhanced with linespoints pi 30 pt "%s" lt rgb "black" dt 1' % 
-            (i+2, self.ALL_OBJECTS_NAME[i], self.OBJECT_SYMBOLS[i])
+            '"%s" using ($%d):1 title "%s" enhanced with linespoints pi 30 pt "%s" lt rgb "black" dt 1' % 
+            (self.dataFile, i+2, self.ALL_OBJECTS_NAME[i], self.OBJECT_SYMBOLS[i])
             for i in range(0, len(self.ALL_OBJECTS))
         ]))
 
         gp.c("unset output")
         while True:
             time.sleep(0.1)
-            ret = open("temp.svg", "r").read()
+            ret = open(self.svgFile, "r").read()
             if "</svg>" in ret: break 
-        os.unlink("temp.svg")
-        #os.unlink("tmp.dat")
+        os.unlink(self.svgFile)
+        os.unlink(self.dataFile)
         return ret
 
 
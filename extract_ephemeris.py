@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+
+# Writes an excerpt of de421.bsp, holding only the segments of the bodies
+# in _constants.py over the given years, to de421-excerpt-FIRST-LAST.bsp.
+# Scripts load the smallest excerpt covering their years instead of the full
+# ephemeris, and the full one for years no excerpt covers (see
+# loadEphemeris).
+#
+#   python3 extract_ephemeris.py 2020 [2022]
+
+from jplephem.spk import SPK
+from jplephem.excerpter import write_excerpt
+
+from _constants import *
+
+import os
+import sys
+
+FIRST_YEAR = int(sys.argv[1])
+LAST_YEAR = int(sys.argv[2]) if len(sys.argv) > 2 else FIRST_YEAR
+assert 2000 < FIRST_YEAR <= LAST_YEAR < 3000
+
+start_jd, end_jd = ephemerisSpan(FIRST_YEAR, LAST_YEAR)
+EXCERPT = EPHEMERIS_EXCERPT % (FIRST_YEAR, LAST_YEAR)
+
+# the chains of segments of the bodies of _constants.py, as found by their
+# NAIF codes, whatever skyfield makes of them
+spk = SPK.open(EPHEMERIS)
+segments = segmentChains(spk.segments)
+summaries = [
+    summary for summary, segment in zip(spk.daf.summaries(), spk.segments)
+    if segment in segments
+]
+
+# the excerpt in use may be memory mapped by other processes, only replace
+# it once complete
+temp = EXCERPT + ".tmp"
+with open(temp, "w+b") as output:
+    write_excerpt(spk, output, start_jd, end_jd, summaries)
+spk.close()
+os.replace(temp, EXCERPT)
+
+print("%s written, %d bytes instead of %d, for years %d to %d." % (
+    EXCERPT, os.path.getsize(EXCERPT), os.path.getsize(EPHEMERIS),
+    FIRST_YEAR, LAST_YEAR
+))
@@ -15,17 +15,35 @@ from skyfield.api import load, Topos
 from skyfield.units import Angle
 from skyfield.earthlib import sidereal_time
 
+from _constants import ephemeris421
 from _svgnode import *
+from _calculations import calculateMoonPhase, calculatePlanets
+from _calculations import calculateSolarterms, calculateSunRiseSet
 from _calendar import listDates
+from _positions import PositionCache
+from _nutation import applyNutation
+from _utils import utcStrftime
 from save_calculations import cached, CalculationResults, getCached
 
 from diagram_of_planets import DiagramOfPlanets
 
 
-objects = load("de421.bsp")
+objects = ephemeris421
 sun = objects["Sun"]
 earth = objects["Earth"]
 timescale = load.timescale()
+positionCaches = {} # (year, month): PositionCache
+
+
+def positionsOf(year, month):
+    if (year, month) not in positionCaches:
+        positionCaches[(year, month)] = PositionCache(
+            earth,
+            timescale.utc(year, month, 1),
+            timescale.utc(year, month + 1, 1) if month < 12 else
+            timescale.utc(year + 1, 1, 1)
+        )
+    return positionCaches[(year, month)]
 
 
 convertSign = lambda i: "" if i >= 0 else "-"
@@ -165,12 +183,19 @@ class MonthGenerator:
         self.frontRange = (1, 16)
         self.backRange = (self.monthLastDay - 15, self.monthLastDay)
 
+        # the columns of this month only, computed if not cached yet; the
+        # events are searched over the whole year by table_of_events.py
         self.calculationResults = {
-            "moonphase": getCached("moonphase", self.year),
-            "solarterms": getCached("solarterms", self.year),
-            "sunriseset": getCached("sunriseset", self.year),
+            "moonphase": calculateMoonPhase(self.year, [self.month]),
+            "solarterms": calculateSolarterms(self.year, [self.month]),
+            "sunriseset": calculateSunRiseSet(self.year, [self.month]),
             "events": getCached("events", self.year),
-            "planets": getCached("planets", self.year),
+            "planets": calculatePlanets(self.year, [self.month]),
+        }
+
+        # index of each day of the month into these columns
+        self.dayIndex = {
+            day: day - 1 for day in range(1, self.monthLastDay + 1)
         }
 
         self.diagramOfPlanets = DiagramOfPlanets(self.year, self.month)
@@ -329,13 +354,14 @@ class MonthGenerator:
             ("Neptune", "海王星"),
         ]
         data = []
+        planets = self.calculationResults["planets"]
         for planetName, planetTranslation in items:
-            src = self.calculationResults["planets"][planetName][self.month][day]
+            src = (list(planets["planets"]).index(planetName), self.dayIndex[day])
             data.append([
                 planetTranslation,
-                convertHM(  Angle(hours=src["ra"]) ),
-                convertDeg( Angle(degrees=src["dec"]) ),
-                convertDeg( Angle(degrees=src["ecllon"]) ),
+                convertHM(  Angle(hours=planets["ra"][src]) ),
+                convertDeg( Angle(degrees=planets["dec"][src]) ),
+                convertDeg( Angle(degrees=planets["ecllon"][src]) ),
             ])
 
             
@@ -355,16 +381,19 @@ class MonthGenerator:
         count = 0
         MAXROWS = 10 
         COLWIDTH = 180
-        for each in self.calculationResults["events"][self.month-1]:
-            day = int(each[1])
+        events = self.calculationResults["events"]
+        for jd, description in zip(events["time"], events["text"]):
+            utcT = timescale.tt_jd(jd).utc_datetime()
+            if utcT.month != self.month: continue
+            day = utcT.day
             if not (start <= day <= end): continue
             count += 1
             n = SVGNode("text", **{
                 "x": x,
                 "y": y,
                 "class": "common"
-            }).append("%02d日 %s %s" % (
-                day, each[2], each[3]
+            }).append("%02d日 %02d:%02d %s" % (
+                day, utcT.hour, utcT.minute, description
             ))
             node.append(n)
             y += 10
@@ -402,16 +431,24 @@ class MonthGenerator:
 
     def _rowSubcalendar(self, start, end):
         solartermTable = {}
-        solarterms = self.calculationResults["solarterms"]["solarterms-iso"]
-        UTC = timezone("UTC") 
-        for solartermName in solarterms:
-            stDatetime = dateutil.parser\
-                .parse(solarterms[solartermName]).astimezone(UTC)
+        solarterms = self.calculationResults["solarterms"]
+        for solartermName, jd in zip(solarterms["names"], solarterms["time"]):
+            stDatetime = timescale.tt_jd(jd).utc_datetime()
             solartermTable[(stDatetime.month, stDatetime.day)] = (
-                solartermName,
+                str(solartermName),
                 stDatetime
             )
-        moondata = self.calculationResults["moonphase"][self.month]
+
+        # moon phases of the month as "HH:MM name", filed under their UTC day
+        moonphase = self.calculationResults["moonphase"]
+        moonPhaseTable = {}
+        for jd, phase in zip(moonphase["phaseTime"], moonphase["phase"]):
+            _, mm, dd, _, _, _ = timescale.tt_jd(jd).utc
+            if mm != self.month: continue
+            moonPhaseTable[dd] = "%s %s" % (
+                utcStrftime(timescale, jd, "%H:%M"),
+                ["朔", "上弦", "望", "下弦"][phase]
+            )
 
         row1, row2 = [], []
         # row1: by default lunar dates
@@ -439,8 +476,8 @@ class MonthGenerator:
                 st = solartermTable[(self.month, day)]
                 displaySolarterm = display(st[0], st[1].strftime("%H%M"))
             displayMoonPhase = None
-            if moondata[day]["phase"]:
-                displayMoonPhase = moondata[day]["phase"].replace(":", "")
+            if day in moonPhaseTable:
+                displayMoonPhase = moonPhaseTable[day].replace(":", "")
                 displayMoonPhase = displayMoonPhase.split(" ")
                 displayMoonPhase.reverse()
                 displayMoonPhase = display(*displayMoonPhase)
@@ -469,12 +506,13 @@ class MonthGenerator:
         retEcllon, retEq = ["........视黄经"], ["........均时差"]
 
         for day in range(start, end+1):
-            tdb0 = timescale.tdb(self.year, self.month, day, 0, 0, 0)
+            tdb0 = applyNutation(
+                timescale.tdb(self.year, self.month, day, 0, 0, 0))
             tt0  = timescale.tt(self.year, self.month, day, 0, 0, 0)
             utc0 = timescale.utc(self.year, self.month, day, 0, 0, 0)
             ut10 = timescale.ut1(self.year, self.month, day, 0, 0, 0)
 
-            astrometric = earth.at(tdb0).observe(sun).apparent()
+            astrometric = positionsOf(self.year, self.month).apparent(sun, tdb0)
             ra, dec, distance = astrometric.radec(epoch='date')
             ecllat, ecllon, _ = astrometric.ecliptic_latlon(epoch='date')
 
@@ -489,10 +527,19 @@ class MonthGenerator:
         return [retEq, retRA, retDEC, retEcllon]
 
     def _rowsRiseset(self, start, end):
-        moondata = self.calculationResults["moonphase"][self.month]
-        sundata =  self.calculationResults["sunriseset"][-0.8333][self.month]
-        ctwidata = self.calculationResults["sunriseset"][-6][self.month]
-        atwidata = self.calculationResults["sunriseset"][-18][self.month]
+        moondata = self.calculationResults["moonphase"]
+        sundata = self.calculationResults["sunriseset"]
+        days = [self.dayIndex[day] for day in range(start, end+1)]
+
+        # rise / set of the days as HH:MM, of the crit (or the moon) at lat
+        def riseset(data, lat, crit=None):
+            where = (days, list(data["latitudes"]).index(lat))
+            if crit is not None:
+                where = (list(data["levels"]).index(crit),) + where
+            return zip(
+                utcStrftime(timescale, data["rise"][where], "%H:%M"),
+                utcStrftime(timescale, data["set"][where], "%H:%M"),
+            )
 
         ret = []
         for lat in [20, 30, 35, 40, 45, 50]:
@@ -502,23 +549,13 @@ class MonthGenerator:
             retMoon = ["......月出月没"]
             merge = lambda x, y: \
                 ((x or "-无-") + "/" + (y or "-无-")).replace(":", "")
-            for day in range(start, end+1):
-                retSun.append(merge(
-                    sundata[day][lat]["rise"],
-                    sundata[day][lat]["set"]
-                ))
-                retCTwi.append(merge(
-                    ctwidata[day][lat]["rise"],
-                    ctwidata[day][lat]["set"]
-                ))
-                retATwi.append(merge(
-                    atwidata[day][lat]["rise"],
-                    atwidata[day][lat]["set"]
-                ))
-                retMoon.append(merge(
-                    moondata[day]["riseset"][lat]["rise"],
-                    moondata[day]["riseset"][lat]["set"]
-                ))
+            for row, data, crit in [
+                (retSun, sundata, -0.8333),
+                (retCTwi, sundata, -6),
+                (retATwi, sundata, -18),
+                (retMoon, moondata, None),
+            ]:
+                row += [merge(*times) for times in riseset(data, lat, crit)]
             ret.append(retSun)
             ret.append(retCTwi)
             ret.append(retATwi)
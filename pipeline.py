@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+
+# Builds the almanac of a year, or of a range of years.
+#
+#   python3 pipeline.py 2020 [stage ...]
+#   python3 pipeline.py 2020-2029 [stage ...]
+#
+# Each stage is one of the scripts formerly called by calc-for-new-year.sh,
+# run in a process of its own with the year as its argument, so that the
+# scripts share nothing but their files. A stage starts as soon as the
+# stages it depends on have finished for its year, so that independent
+# stages, and the stages of different years, run concurrently, one per core
+# at a time. With stages given, only these and the stages they depend on are
+# run. Each year writes its own files in calculations-cache and
+# calculations, so that the processes do not interfere.
+#
+# Before the other stages, the ephemeris stage extracts one ephemeris
+# excerpt for all the years, unless one covering them exists already. It is
+# optional: if it fails, or is not among the stages given, the scripts load
+# the full DE421 instead (see _constants.loadEphemeris).
+
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import os
+import subprocess
+import sys
+import time
+
+
+EPHEMERIS = "extract_ephemeris.py"
+
+STAGES = {
+    # name:         (script, stages it depends on)
+    "moon":         ("table_of_moon.py", []),
+    "solarterms":   ("table_of_solarterms.py", []),
+    "sun":          ("table_of_sun.py", []),
+    "sunriseset":   ("table_of_sunrise_and_sunset.py", []),
+    "planets":      ("table_of_planets.py", []),
+    "juliantime":   ("table_of_juliantime.py", []),
+    "calendar":     ("table_of_calendar.py", ["solarterms"]),
+    "events":       ("table_of_events.py", ["moon", "solarterms"]),
+    "monthgen":     ("monthgen.py", [
+        "moon", "solarterms", "sun", "sunriseset", "planets", "juliantime",
+        "calendar", "events",
+    ]),
+}
+
+
+def withDependencies(names):
+    selected = set()
+    while names:
+        name = names.pop()
+        if name not in selected:
+            selected.add(name)
+            names += STAGES[name][1]
+    return selected
+
+
+def runScript(label, script, *args):
+    """Runs script with args in a new process, raising RuntimeError if it
+    fails."""
+    print("[%s] %s started." % (label, script))
+    started = time.time()
+    command = [sys.executable, script] + [str(arg) for arg in args]
+    code = subprocess.run(command).returncode
+    if code != 0:
+        raise RuntimeError("%s exited with %s" % (script, code))
+    print("[%s] finished in %.1fs." % (label, time.time() - started))
+
+
+def extractEphemeris(first, last):
+    """Extracts the excerpt of the ephemeris for the years first to last,
+    unless one covering them exists. Returns whether there is one in the
+    end; the scripts load the full ephemeris otherwise."""
+    from _constants import excerptCovering
+    label = "%d-%d ephemeris" % (first, last)
+    if excerptCovering(first, last):
+        print("[%s] skipped, covered by an excerpt." % label)
+        return True
+    try:
+        runScript(label, EPHEMERIS, first, last)
+    except Exception as e:
+        print("[%s] failed, using the full ephemeris: %s" % (label, e))
+        return False
+    return True
+
+
+def run(first, last, names=None, workers=None):
+    """Runs the given stages (all by default) for each year from first to
+    last, on at most workers processes (one per core by default) at a time.
+    Returns {year: names of the stages failed or skipped because of a failed
+    dependency}."""
+    names = list(names or ["ephemeris"] + list(STAGES))
+    if "ephemeris" in names:
+        names.remove("ephemeris")
+        extractEphemeris(first, last)
+
+    years = range(first, last + 1)
+    selected = withDependencies(names)
+    pending = {(year, name) for year in years for name in selected}
+    done, failed = set(), {year: set() for year in years}
+    for year in years:
+        os.makedirs(os.path.join("calculations", str(year)), exist_ok=True)
+
+    # the threads only wait for the processes of the stages
+    with ThreadPoolExecutor(workers or os.cpu_count()) as pool:
+        running = {}
+        while pending or running:
+            for year, name in sorted(pending):
+                dependencies = STAGES[name][1]
+                if set(dependencies) & failed[year]:
+                    print("[%d %s] skipped." % (year, name))
+                    failed[year].add(name)
+                    pending.remove((year, name))
+                elif all((year, d) in done for d in dependencies):
+                    label = "%d %s" % (year, name)
+                    future = pool.submit(
+                        runScript, label, STAGES[name][0], year)
+                    running[future] = (year, name)
+                    pending.remove((year, name))
+            if not running:
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                year, name = running.pop(future)
+                try:
+                    future.result()
+                    done.add((year, name))
+                except Exception as e:
+                    print("[%d %s] failed: %s" % (year, name, e))
+                    failed[year].add(name)
+    return failed
+
+
+if __name__ == "__main__":
+    YEARS = [int(year) for year in sys.argv[1].split("-")]
+    assert all(2000 < year < 3000 for year in YEARS)
+    names = sys.argv[2:] or None
+
+    started = time.time()
+    results = run(YEARS[0], YEARS[-1], names)
+    print("Built in %.1fs." % (time.time() - started))
+
+    failed = False
+    for year in sorted(results):
+        if results[year]:
+            print("Failed for %d: %s" % (year, ", ".join(sorted(results[year]))))
+            failed = True
+    if failed:
+        exit(1)
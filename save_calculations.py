@@ -1,7 +1,15 @@
 #!/usr/bin/env python3
 
-import yaml 
+from _constants import EPHEMERIS, ephemeris421
+
+import contextlib
+import fcntl
+import functools
+import hashlib
+import numpy as np
 import os
+import threading
+import zipfile
 
 
 class CalculationResults:
@@ -21,36 +29,198 @@ class CalculationResults:
         self.file.close()
 
 
-def getCached(name, year):
-    path = os.path.join("calculations-cache", "%s-%d.yaml" % (name, year))
-    data = yaml.load(open(path, "r").read())
+# A cache holds the results of a calculation as columns: a dict of NumPy
+# arrays of numbers or strings, saved uncompressed with numpy.savez. Times
+# are kept as TT julian dates (NaN for none), formatted only when written
+# out, e.g. with _utils.utcStrftime.
+#
+# Results of @cached functions are kept in calculations-cache/NAME-YEAR/,
+# each under a fingerprint of everything it was computed from (see
+# fingerprint), so that a result is never reused once its inputs changed.
+# The latest result of each is also saved as calculations-cache/NAME-YEAR.npz
+#
+# Caches are not kept in git, but computed again by the stages of
+# pipeline.py wherever missing. The YAML caches of earlier versions are not
+# read any more by getCached, and were removed.
+# and read by getCached, e.g. by monthgen.
+
+
+def _inputFiles():
+    # the ephemeris, and the files of delta T and leap seconds read by
+    # load.timescale(); the excerpt loaded only when the full ephemeris it
+    # was extracted from is absent, as it changes with the years extracted
+    ephemeris = EPHEMERIS if os.path.exists(EPHEMERIS) else ephemeris421.path
+    return [ephemeris, "deltat.data", "deltat.preds", "Leap_Second.dat"]
+
+_fileHashes = {}
+
+def _fileHash(path):
+    # hash of the content of a file, or None if missing, computed once per
+    # process as long as the file is unchanged
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    if key not in _fileHashes:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        _fileHashes[key] = digest.hexdigest()
+    return _fileHashes[key]
+
+def fingerprint(*parts):
+    """Hash of the given parts, e.g. name, year, code version and parameters
+    of a calculation, by their repr(), and of the contents of the input
+    files."""
+    digest = hashlib.sha256(repr(parts).encode("utf-8"))
+    for path in _inputFiles():
+        digest.update(repr((path, _fileHash(path))).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _cachePath(name, year):
+    return os.path.join("calculations-cache", "%s-%d.npz" % (name, year))
+
+def _entryPath(name, year, key):
+    return os.path.join("calculations-cache", "%s-%d" % (name, year),
+        "%s.npz" % key[:24])
+
+def _load(path):
+    with np.load(path, allow_pickle=False) as data:
+        return {key: data[key] for key in data.files}
+
+# Caches loaded by getCached, and the entries of @cached functions, are kept
+# by the process and shared by all its callers, e.g. the events of a year
+# for monthgen rendering all its months, or the entries of a year loaded by
+# monthgen again month by month. A year has some 450 entries of a few
+# kilobytes each. They are told apart by the size, modification time and
+# inode of the file, so that a file written again (always to a new file, see
+# _save) is loaded again.
+LOADED_CACHES = 1024
+
+@functools.lru_cache(maxsize=LOADED_CACHES)
+def _loadShared(path, stat):
+    data = _load(path)
+    for column in data.values():
+        column.setflags(write=False)
     return data
 
-def _getCachedResult(name, year, calcfunc):
-    # Checks if calcfunc had run before. If yes, return cached value.
-    # Otherwise, run calcfunc, cache its result, and return that.
-    path = os.path.join("calculations-cache", "%s-%d.yaml" % (name, year))
-    if os.path.isfile(path):
-        try:
-            print("Cache %s(%d) found." % (name, year))
-            data = yaml.load(open(path, "r").read())
-            return data
-        except:
-            print("Cache %s(%d) corrupted. Calculate for that." % (name,year))
-    data = calcfunc(year=year)
-    open(path, "w+").write(yaml.dump(
-        data,
-        default_flow_style=False,
-        allow_unicode=True
-    ))
+def _loadKept(path):
+    stat = os.stat(path)
+    return _loadShared(path, (stat.st_size, stat.st_mtime_ns, stat.st_ino))
+
+def _loadEntry(path):
+    # the read-only columns cached at path, or None if there are none to
+    # read
+    if not os.path.isfile(path):
+        return None
+    try:
+        return _loadKept(path)
+    except (OSError, ValueError, EOFError, zipfile.BadZipFile) as e:
+        print("Cache %s corrupted (%s). Calculate for that." % (path, e))
+        return None
+
+def _save(path, data):
+    # written to a temporary file first, and renamed to path once complete,
+    # so that readers in other processes see either no file or a whole one
+    temp = "%s.%d-%d.tmp" % (path, os.getpid(), threading.get_ident())
+    try:
+        with open(temp, "wb") as f:
+            np.savez(f, **data)
+        os.replace(temp, path)
+    finally:
+        if os.path.exists(temp):
+            os.remove(temp)
+
+@contextlib.contextmanager
+def _locked(directory):
+    # Holds an exclusive lock on the .lock file of the directory of entries,
+    # so that of the workers computing entries of the same calculation and
+    # year, all but the first wait for it. The file is kept, as removing it
+    # would let a worker still waiting on it go ahead of the next one.
+    with open(os.path.join(directory, ".lock"), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        yield # the lock is released when f is closed
+
+def _columns(data):
+    return {key: np.asarray(value) for key, value in data.items()}
+
+def getCached(name, year):
+    """The latest result cached as name for year, as a dict of read-only
+    columns."""
+    return _loadKept(_cachePath(name, year))
+
+def saveCached(name, year, data):
+    _save(_cachePath(name, year), data)
+
+def _getCachedSlices(name, year, calcfunc, version, parameters, slices):
+    # Loads the columns of each slice cached before, runs calcfunc for the
+    # others and caches them. Returns the columns of all slices in order.
+    paths = [
+        _entryPath(name, year, fingerprint(name, year, version, parameters, s))
+        for s in slices
+    ]
+    results = [_loadEntry(path) for path in paths]
+    missing = [i for i, data in enumerate(results) if data is None]
+    if not missing:
+        print("Cache %s(%d): %d of %d found." % (
+            name, year, len(slices), len(slices)))
+        return results
+
+    os.makedirs(os.path.dirname(paths[0]), exist_ok=True)
+    with _locked(os.path.dirname(paths[0])):
+        # another worker may have computed them while we waited
+        for i in missing:
+            results[i] = _loadEntry(paths[i])
+        missing = [i for i, data in enumerate(results) if data is None]
+        print("Cache %s(%d): %d of %d found." % (
+            name, year, len(slices) - len(missing), len(slices)))
+        if missing:
+            computed = calcfunc(year=year, slices=[slices[i] for i in missing])
+            for i, data in zip(missing, computed):
+                results[i] = _columns(data)
+                _save(paths[i], results[i])
+    return results
+
+def _getCachedResult(name, year, calcfunc, version, parameters, slices,
+    combine, latest):
+    # Checks if calcfunc had run before with the same inputs. If yes, return
+    # cached value. Otherwise, run calcfunc, cache its result, and return
+    # that.
+    if slices is None:
+        data, = _getCachedSlices(
+            name, year, lambda year, slices: [calcfunc(year=year)],
+            version, parameters, [None])
+    else:
+        data = _columns(combine(_getCachedSlices(
+            name, year, calcfunc, version, parameters, slices)))
+    if latest:
+        saveCached(name, year, data)
     return data
 
 
-def cached(name, year):
+def cached(name, year, version=1, parameters=None, slices=None, combine=None,
+    latest=True):
     # Use @cached('solarterms', 2020) to decorate the calculation function
     # for solar terms. The `year` argument will be passed to this calculation
-    # function.
+    # function, which returns its results as columns (see above).
+    #
+    # The result is reused as long as the input files, version and
+    # parameters (any value with a stable repr(), e.g. a dict of the
+    # settings of the calculation) are the same. Raise version whenever the
+    # calculation itself changes.
+    #
+    # With slices, e.g. [(threshold, latitude), ...], each slice is cached
+    # on its own: the calculation function is called with `slices` set to
+    # those not cached yet, returning a list of columns for each of them,
+    # and combine(list of columns of all slices) gives the result. Adding a
+    # slice then computes only that one.
+    #
+    # With latest=False, the result is not saved for getCached, e.g. when it
+    # covers only part of the year.
     def wrapper(calcfunc):
-        return lambda: _getCachedResult(name, year, calcfunc)
+        return lambda: _getCachedResult(
+            name, year, calcfunc, version, parameters, slices, combine, latest)
     return wrapper
-
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+# Puts the results of a year into the store (see _store.py), replacing those
+# put there before:
+#
+#   python3 store_calculations.py 2020 [calculations/almanac.sqlite]
+#
+# Run table_of_events.py for the year first. The other results are taken
+# from their caches, or computed if missing.
+
+from _calculations import calculateMoonPhase, calculatePlanets
+from _calculations import calculateSunRiseSet
+from _constants import timescale
+from _riseset import MOON_HORIZON
+from _store import Store, STORE
+from save_calculations import getCached
+
+import sys
+import numpy as np
+
+YEAR = int(sys.argv[1])
+assert 2000 < YEAR < 3000
+PATH = sys.argv[2] if len(sys.argv) > 2 else STORE
+
+
+def listEvents(events):
+    for time, eventType, body, parameters in zip(
+        events["time"], events["type"], events["body"], events["parameters"]
+    ):
+        yield float(time), str(eventType), str(body) or None, str(parameters)
+
+
+def listPositions(planets):
+    # positions of each day at 0h UTC
+    jd = timescale.utc(YEAR, planets["month"], planets["day"]).tt
+    for i, body in enumerate(planets["planets"]):
+        for time, ra, dec, ecllon in zip(
+            jd, planets["ra"][i], planets["dec"][i], planets["ecllon"][i]
+        ):
+            yield float(time), str(body), float(ra), float(dec), float(ecllon)
+
+
+def listRiseSet(body, data, levels):
+    # rise[level][day][lat] and set[level][day][lat] of data, with NaN on
+    # days without
+    for key, direction in (("rise", 1), ("set", -1)):
+        times = np.reshape(data[key], (len(levels),) + data[key].shape[-2:])
+        for level_i, day_i, lat_i in zip(*np.nonzero(np.isfinite(times))):
+            yield (
+                float(times[level_i, day_i, lat_i]), body,
+                float(data["latitudes"][lat_i]), 0.0,
+                float(levels[level_i]), direction
+            )
+
+
+sunriseset = calculateSunRiseSet(YEAR)
+moonphase = calculateMoonPhase(YEAR)
+
+with Store(PATH) as store:
+    store.addEvents(YEAR, listEvents(getCached("eventlist", YEAR)))
+    store.addPositions(YEAR, listPositions(calculatePlanets(YEAR)))
+    store.addRiseSet(YEAR, (row for rows in [
+        listRiseSet("Sun", sunriseset, sunriseset["levels"]),
+        listRiseSet("Moon", moonphase, [MOON_HORIZON]),
+    ] for row in rows))
+
+print("Year %d stored in %s." % (YEAR, PATH))
@@ -4,17 +4,22 @@
 
 from skyfield import api, almanac
 from skyfield.api import load, Topos, Star
-from skyfield.units import Angle
+from skyfield.units import Angle, Distance
+from skyfield.functions import to_spherical, rot_x
+from skyfield.constants import DEG2RAD
 from skyfield.earthlib import sidereal_time
-from skyfield.nutationlib import iau2000b
 
+from _nutation import applyNutation
 from _utils import roundTimeToMinute
 from _constants import *
-from _rootfinder import  root_finder, critical_point_finder
+from _rootfinder import root_finder
+from _rootfinder import stacked_root_finder, stacked_chebyshev_finder
+from _positions import PositionCache
+import _rootfinder
 from _spheric_dist import spherical_distance
 
 from _calendar import listDates
-from save_calculations import CalculationResults
+from save_calculations import CalculationResults, saveCached
 
 import yaml
 import json
@@ -27,6 +32,9 @@ import dateutil.parser
 YEAR = int(sys.argv[1])
 assert 2000 < YEAR < 3000
 
+# evaluation budget of each search of this year, dumped at the end
+finderReports = _rootfinder.start_reports()
+
 
 
 moonPhasePath = os.path.join("calculations", str(YEAR), "moonphase.json")
@@ -48,6 +56,18 @@ solarterms = json.loads(open(solartermsPath, "r").read())
 
 ##############################################################################
 
+# Sun, moon, planets and stars are each observed once over the year, and
+# interpolated for all searches below. The sun, moon and planets are
+# observed together.
+positions = PositionCache(
+    Earth,
+    timescale.utc(YEAR, 1, 1),
+    timescale.utc(YEAR, 12, 31, 23, 59, 59)
+)
+positions.sample([
+    Sun, Moon, Mercury, Venus, Mars, Jupiter, Saturn, Uranus, Neptune, Pluto])
+
+
 def derivate(f):
     # A derivate decorator.
     #
@@ -73,104 +93,99 @@ class MoonTrack:
     PERIGEE = "Perigee / 近地点"
     APOGEE = "Apogee / 远地点"
 
-    def findApsides(self):
-        def f(t):
-            t._nutation_angles = iau2000b(t.tt)
-            observ = Earth.at(t).observe(Moon).apparent().radec()
-            return observ[2].km
-        f.rough_period = 29
-        critical_points = critical_point_finder(
-            start_time=self.year_period[0],
-            end_time=self.year_period[1],
-            f=f,
-            num=2048,
-            epsilon=10000000
-        )
-        return [
-            (
-                t[1],
-                self.PERIGEE if y[2]-y[1]>0 and y[1]-y[0]<0 else self.APOGEE,
-            )
-            for t, y in critical_points
-        ]
-
     ECLIPTIC_PASSAGE_ASCENDING = "Ecliptic Passage(Ascending) / 黄道升交点"
     ECLIPTIC_PASSAGE_DECENDING = "Ecliptic Passage(Decending) / 黄道降交点"
 
-    def findEclipticPassage(self):
-        def f(t):
-            t._nutation_angles = iau2000b(t.tt)
-            observ = Earth.at(t).observe(Moon).apparent().ecliptic_latlon()
-            return observ[0].degrees
-        f.rough_period = 14
-        roots = root_finder(
-            f=f,
-            start_time=self.year_period[0], end_time=self.year_period[1]
-        )
-        outputs = []
-        for t0, lat0 in roots:
-            t1 = t0.ts.tt_jd(t0.tt + 1)
-            ecllat1 = f(t1)
-            outputs.append((
-                t0,
-                self.ECLIPTIC_PASSAGE_ASCENDING if ecllat1 > lat0 else
-                self.ECLIPTIC_PASSAGE_DECENDING
-            ))
-        return outputs
-
     EQUATORIAL_PASSAGE_ASCENDING = "Equatorial Passage(Ascending) / 赤道升交点"
     EQUATORIAL_PASSAGE_DECENDING = "Equatorial Passage(Decending) / 赤道降交点"
 
-    def findEquatorialPassage(self):
-        def f(t):
-            t._nutation_angles = iau2000b(t.tt)
-            observ = Earth.at(t).observe(Moon).apparent().radec()
-            return observ[1].degrees
-        f.rough_period = 14
-        roots = root_finder(
-            f=f,
-            start_time=self.year_period[0], end_time=self.year_period[1]
-        )
-        outputs = []
-        for t0, dec0 in roots:
-            t1 = t0.ts.tt_jd(t0.tt + 1)
-            dec1 = f(t1)
-            outputs.append((
-                t0,
-                self.EQUATORIAL_PASSAGE_ASCENDING if dec1 > dec0 else
-                self.EQUATORIAL_PASSAGE_DECENDING
-            ))
-        return outputs
-
     EQUATORIAL_FARTHEST_NORTH = "Equatorial Farthest North / 赤纬北点"
     EQUATORIAL_FARTHEST_SOUTH = "Equatorial Farthest South / 赤纬南点"
 
-    def findEquatorialFarthest(self):
+    # what is searched on each quantity of _observe
+    SEARCHES = [
+        ("roots", 29, 1e-6),           # apsides
+        ("roots", 14, 1e-6),           # ecliptic passages
+        ("roots", 14, 1e-6),           # equatorial passages
+        ("critical_points", 14, 1e-4), # equatorial farthest
+    ]
 
-        def f(t):
-            t._nutation_angles = iau2000b(t.tt)
-            observ = Earth.at(t).observe(Moon).apparent().radec()
-            return observ[1].degrees
-        f.rough_period = 14 
-        critical_points = critical_point_finder(
-            start_time=self.year_period[0],
-            end_time=self.year_period[1],
-            f=f
-        )
-        return [
-            (
-                t[1],
+    def _observe(self, t, k):
+        # the k-th of the rate of distance (in au per day, zero at the
+        # apsides), ecliptic latitude, declination and declination again of
+        # the moon, all from one apparent position and its velocity
+        applyNutation(t)
+        observ = positions.apparent(Moon, t)
+        _, dec, distance = observ.radec()
+        ecllat = observ.ecliptic_latlon()[0]
+        rate = np.sum(observ.position.au * observ.velocity.au_per_d, axis=0)\
+            / distance.au
+        return np.choose(
+            k, [rate, ecllat.degrees, dec.degrees, dec.degrees])
+
+    def findAll(self):
+        """Apsides, ecliptic passages, equatorial passages and equatorial
+        farthest points of the moon, searched together on one scan of its
+        positions (see stacked_chebyshev_finder)."""
+        apsides, eclipticRoots, equatorialRoots, farthest = \
+            stacked_chebyshev_finder(
+                start_time=self.year_period[0],
+                end_time=self.year_period[1],
+                f=self._observe,
+                searches=self.SEARCHES
+            )
+
+        # the moon is at perigee if the rate of its distance, and passes
+        # ascending if the latitude or declination, is larger a day later,
+        # evaluated for all roots at once
+        roots = apsides + eclipticRoots + equatorialRoots
+        if roots:
+            t0 = np.array([t.tt for t, _ in roots])
+            k = np.repeat([0, 1, 2], [
+                len(apsides), len(eclipticRoots), len(equatorialRoots)])
+            ascending = self._observe(timescale.tt_jd(t0 + 1), k) > \
+                np.array([y for _, y in roots], dtype=float)
+        else:
+            ascending = np.zeros(0, dtype=bool)
+        perigee, eclipticAscending, equatorialAscending = np.split(
+            ascending, np.cumsum([len(apsides), len(eclipticRoots)]))
+
+        return (
+            [
+                (t0, self.PERIGEE if p else self.APOGEE)
+                for (t0, _), p in zip(apsides, perigee)
+            ],
+            [
                 (
-                    self.EQUATORIAL_FARTHEST_SOUTH\
-                    if y[2]-y[1]>0 and y[1]-y[0]<0\
-                    else self.EQUATORIAL_FARTHEST_NORTH,
-                    y[1]
+                    t0,
+                    self.ECLIPTIC_PASSAGE_ASCENDING if a else
+                    self.ECLIPTIC_PASSAGE_DECENDING
                 )
-            )
-            for t, y in critical_points
-        ]
+                for (t0, _), a in zip(eclipticRoots, eclipticAscending)
+            ],
+            [
+                (
+                    t0,
+                    self.EQUATORIAL_PASSAGE_ASCENDING if a else
+                    self.EQUATORIAL_PASSAGE_DECENDING
+                )
+                for (t0, _), a in zip(equatorialRoots, equatorialAscending)
+            ],
+            [
+                (
+                    t[1],
+                    (
+                        self.EQUATORIAL_FARTHEST_SOUTH\
+                        if y[2]-y[1]>0 and y[1]-y[0]<0\
+                        else self.EQUATORIAL_FARTHEST_NORTH,
+                        y[1]
+                    )
+                )
+                for t, y in farthest
+            ],
+        )
 
-#for ti, yi in MoonTrack().findEquatorialFarthest():
+#for ti, yi in MoonTrack().findAll()[3]:
 #    print(ti.utc_iso(), yi)
 #exit()
 
@@ -193,50 +208,83 @@ class SunAspectFinder:
             timescale.utc(YEAR, 12, 31, 23, 59, 59)
         )
 
-    def _deltaLambdaAu(self, planet, t):
-        t._nutation_angles = iau2000b(t.tt)
-        sunApparent = Earth.at(t).observe(Sun).apparent()
-        planetApparent = Earth.at(t).observe(planet).apparent()
-        sunPos = sunApparent.ecliptic_latlon('date')
-        planetPos = planetApparent.ecliptic_latlon('date')
-
-        return (
-            sunPos[1].degrees - planetPos[1].degrees,
-            sunPos[2].km - planetPos[2].km
-        )
+    def _ecliptic(self, body, t, rotation):
+        # ecliptic longitude in degrees and distance in km, as rows; as
+        # ecliptic_latlon('date') with the rotation of t into its ecliptic
+        position = positions.apparent(body, t).position.au
+        d, _, lon = to_spherical(
+            np.einsum("ij...,j...->i...", rotation, position))
+        return np.array([Angle(radians=lon).degrees, Distance(au=d).km])
+
+    def _deltaLambdaAu(self, planets, t, k):
+        # longitude and distance of the sun minus those of the planet k at
+        # t, with k broadcast against t; the nutation is applied and the sun
+        # observed once for all planets
+        applyNutation(t)
+        _, oblt, _, _, _ = t._earth_tilt
+        rotation = np.einsum(
+            "ij...,jk...->ik...", rot_x(-oblt * DEG2RAD), t.M)
+        shape = np.broadcast(k, t.tt).shape
+        k = np.broadcast_to(k, shape)
+        at = np.broadcast_to(np.arange(np.size(t.tt)), shape)
+        sun = self._ecliptic(Sun, t, rotation)
+        sun = sun.reshape((2,) + (1,) * (len(shape) - 1) + (-1,))
+        planet = np.zeros((2,) + shape)
+        for j in np.unique(k):
+            i = at[k == j]
+            planet[:, k == j] = self._ecliptic(
+                planets[j], timescale.tt_jd(t.tt[i]), rotation[:, :, i])
+        return sun - planet
 
     def find(self, planet):
-        
-        def f(t):
+        return self.findAll([planet])[planet]
+
+    def findAll(self, planets):
+        """Conjunctions, oppositions and quadratures of each of the planets
+        with respect to sun, as {planet: [(ti, aspect), ...]}.
+
+        All planets are searched together by stacked_chebyshev_finder, with
+        the sun observed once per time for all of them, and each planet only
+        at the times it is evaluated for."""
+        planets = list(planets)
+
+        def f(t, k):
             """Conjunction, opposition or quadature of planet with respect
             to sun. By searching the roots of f(t), all aspects will be
             determined. But remains unclear which aspect it is and shall
             be found out later."""
-            return np.sin(self._deltaLambdaAu(planet, t)[0] / 90.0 * np.pi)
-        f.rough_period = 30
+            return np.sin(self._deltaLambdaAu(planets, t, k)[0] / 90.0 * np.pi)
 
-        roots = root_finder(
+        roots = stacked_chebyshev_finder(
             start_time=timescale.utc(YEAR, 1, 1),
             end_time=timescale.utc(YEAR, 12, 31, 23, 59, 59),
-            f=f
+            f=f,
+            searches=[("roots", 30, 1e-6)] * len(planets)
         )
 
-        results = []
-        for ti, _ in roots:
-            deltaLambda, deltaAu = self._deltaLambdaAu(planet, ti)
-
+        # which aspect each root is, from the longitudes and distances at
+        # all roots of all planets at once
+        times = [ti for found in roots for ti, _ in found]
+        k = np.repeat(np.arange(len(planets)), [len(found) for found in roots])
+        if times:
+            deltaLambda, deltaAu = self._deltaLambdaAu(
+                planets, timescale.tt_jd([ti.tt for ti in times]), k)
+
+        results = {planet: [] for planet in planets}
+        for i, ti in enumerate(times):
+            planet = planets[k[i]]
             if planet in [Mercury, Venus]:
                 # Can only be conjunction(superior or inferior). By determining
                 # the Au difference it's easy to tell
-                results.append((
+                results[planet].append((
                     ti,
                     self.CONJUNCTION_INFERIOR
-                    if deltaAu > 0 else self.CONJUNCTION_SUPERIOR
+                    if deltaAu[i] > 0 else self.CONJUNCTION_SUPERIOR
                 ))
             else:
-                sinL = round(np.sin(deltaLambda / 180.0 * np.pi))
-                cosL = round(np.cos(deltaLambda / 180.0 * np.pi))
-                results.append((ti, {
+                sinL = round(np.sin(deltaLambda[i] / 180.0 * np.pi))
+                cosL = round(np.cos(deltaLambda[i] / 180.0 * np.pi))
+                results[planet].append((ti, {
                     (0, 1) : self.CONJUNCTION,
                     (0, -1): self.OPPOSITION,
                     (1, 0):  self.QUADRATURE_WESTERN,
@@ -254,31 +302,71 @@ class MoonConjunctionFinder:
             timescale.utc(YEAR, 12, 31, 23, 59, 59)
         )
 
+    def _radec(self, body, t, M):
+        # RA and declination in degrees, and distance in km, as rows; as
+        # radec('date') with the precession and nutation matrices M of t
+        position = positions.apparent(body, t).position.au
+        r, dec, ra = to_spherical(np.einsum("ij...,j...->i...", M, position))
+        return np.array([
+            Angle(radians=ra, preference="hours")._degrees,
+            Angle(radians=dec, signed=True).degrees,
+            Distance(r).km,
+        ])
+
+    def _observe(self, targets, t, k):
+        # the moon at t, and the target k at t, with k broadcast against t;
+        # the nutation is applied once for all of them
+        applyNutation(t)
+        shape = np.broadcast(k, t.tt).shape
+        k = np.broadcast_to(k, shape)
+        at = np.broadcast_to(np.arange(np.size(t.tt)), shape)
+        moon = self._radec(Moon, t, t.M)
+        moon = moon.reshape((3,) + (1,) * (len(shape) - 1) + (-1,))
+        target = np.zeros((3,) + shape)
+        for j in np.unique(k):
+            i = at[k == j]
+            target[:, k == j] = self._radec(
+                targets[j], timescale.tt_jd(t.tt[i]), t.M[:, :, i])
+        return moon, target
+
     def find(self, star):
-        def observe(t):
-            t._nutation_angles = iau2000b(t.tt)
-            moonApparent = Earth.at(t).observe(Moon).apparent()
-            starApparent = Earth.at(t).observe(star).apparent()
-            return moonApparent.radec('date'), starApparent.radec('date')
-            
-        def f(t):
-            moonRadec, starRadec = observe(t)
-            return moonRadec[0]._degrees - starRadec[0]._degrees
+        return self.findAll([star])[star]
+
+    def findAll(self, targets):
+        """Conjunctions in right ascension of the moon with each of the
+        targets, as {target: [(ti, (diff of declination, visible)), ...]}.
+
+        All targets are searched together by stacked_root_finder, with the
+        moon observed once per time for all of them, and each target only
+        at the times of its own brackets."""
+        targets = list(targets)
+
+        def f(t, k):
+            moon, target = self._observe(targets, t, k)
+            return moon[0] - target[0]
         f.rough_period = 29
-        roots = root_finder(
+        roots = stacked_root_finder(
             start_time=self.year_period[0],
             end_time=self.year_period[1],
-            f=f
+            f=f,
+            count=len(targets),
+            method="illinois"
         )
-        outputs = []
-        for ti, _ in roots:
-            moonRadec, starRadec = observe(ti)
-            moonHalfSize = np.arctan(MOON_RADIUS / moonRadec[2].km) / np.pi * 180
-            decDiff = starRadec[1].degrees - moonRadec[1].degrees
 
-            outputs.append((ti, (decDiff, abs(decDiff) > moonHalfSize)))
-            # (ti, (diff of declination, visible))
-        return outputs
+        founds = {}
+        for k, target in enumerate(targets):
+            founds[target] = []
+            if not roots[k]: continue
+            times = [ti for ti, _ in roots[k]]
+            moon, star = self._observe(
+                targets, timescale.tt_jd([ti.tt for ti in times]), k)
+            moonHalfSize = np.arctan(MOON_RADIUS / moon[2]) / np.pi * 180
+            decDiff = star[1] - moon[1]
+            for i, ti in enumerate(times):
+                founds[target].append(
+                    (ti, (decDiff[i], abs(decDiff[i]) > moonHalfSize[i])))
+                # (ti, (diff of declination, visible))
+        return founds
 
 
 class GreatestSunElongation:
@@ -288,18 +376,17 @@ class GreatestSunElongation:
             timescale.utc(YEAR, 1, 1),
             timescale.utc(YEAR, 12, 31, 23, 59, 59)
         )
-        self.topos_at = Earth.at
 
     def find(self, planet):
         assert planet in [Mercury, Venus]
         def observ(t):
             return (
-                self.topos_at(t).observe(Sun).apparent().position.au,
-                self.topos_at(t).observe(planet).apparent().position.au
+                positions.apparent(Sun, t).position.au,
+                positions.apparent(planet, t).position.au
             )
 
         def g(t):
-            t._nutation_angles = iau2000b(t.tt)
+            applyNutation(t)
             vec1, vec2 = observ(t)
 
             def norm(v):
@@ -312,21 +399,42 @@ class GreatestSunElongation:
             return angle
             #return sunEcllon.degrees - planetEcllon.degrees
 
-        g.rough_period = 40
-        critical_points = critical_point_finder(
+        def rate(t):
+            # -d(cos angle)/dt per day from the positions and velocities,
+            # i.e. d(angle)/dt * sin(angle), zero at the extrema of the
+            # elongation and smooth where the angle comes close to zero
+            applyNutation(t)
+            sun = positions.apparent(Sun, t)
+            body = positions.apparent(planet, t)
+            s, vs = sun.position.au, sun.velocity.au_per_d
+            p, vp = body.position.au, body.velocity.au_per_d
+
+            ss, pp = np.sum(s * s, axis=0), np.sum(p * p, axis=0)
+            cosAngle = np.sum(s * p, axis=0) / np.sqrt(ss * pp)
+            dcosAngle = (
+                (np.sum(vs * p, axis=0) + np.sum(s * vp, axis=0))
+                    / np.sqrt(ss * pp) -
+                cosAngle * (
+                    np.sum(s * vs, axis=0) / ss + np.sum(p * vp, axis=0) / pp)
+            )
+            return -dcosAngle
+
+        rate.rough_period = 40
+        roots = root_finder(
             start_time=self.year_period[0],
             end_time=self.year_period[1],
-            f=g
+            f=rate,
+            method="chebyshev"
         )
         found = []
-        for t3, _ in critical_points:
-            t1 = t3[1].tt
+        for t, _ in roots:
+            t1 = t.tt
             t0 = t1 - 1
             t2 = t1 + 1
-            y3 = g(t3[1].ts.tt_jd(np.array([t0, t1, t2])))
+            y3 = g(t.ts.tt_jd(np.array([t0, t1, t2])))
 
             if (y3[0] < y3[1] and y3[2] < y3[1]):
-                ti = t3[1].ts.tt_jd(t1)
+                ti = t.ts.tt_jd(t1)
                 vec1, vec2 = observ(ti)
                 k = 1 if np.cross(vec1, vec2)[2] > 0 else -1
                 found.append((ti, k * y3[1] * 180 / np.pi ))
@@ -344,19 +452,22 @@ class StationaryFinder:
 
     def find(self, planet):
         def g(t):
-            t._nutation_angles = iau2000b(t.tt)
-            ra1 = Earth.at(t).observe(planet).radec()[0].hours
-            ra2 = 24 - ra1
-            return np.amin(np.array([ra1, ra2]), axis=0)
+            # d(RA)/dt in radians per day from the position and velocity,
+            # zero at the stations
+            astrometric = positions.astrometric(planet, t)
+            x, y, _ = astrometric.position.au
+            vx, vy, _ = astrometric.velocity.au_per_d
+            return (x * vy - y * vx) / (x**2 + y**2)
         g.rough_period = 20 
         found = []
-        critical_points = critical_point_finder(
+        roots = root_finder(
             start_time=self.year_period[0],
             end_time=self.year_period[1],
-            f=g
+            f=g,
+            method="illinois"
         )
-        for t, y in critical_points:
-            found.append(( t[1], None))
+        for t, y in roots:
+            found.append((t, None))
         return found
 
 
@@ -461,9 +572,8 @@ for planet in founds["sun_elongations"]:
 if 1:
     print("Searching for moon conjunctions...")
     moonConjunctionFinder = MoonConjunctionFinder()
-    for star in founds["moon_conjunctions"]:
-        founds["moon_conjunctions"][star] = moonConjunctionFinder.find(star)
-        print(".")
+    founds["moon_conjunctions"] = moonConjunctionFinder.findAll(
+        founds["moon_conjunctions"])
 
 #-----------------------------------------------------------------------------
 # Find out stationaries
@@ -472,31 +582,56 @@ if 1:
     stationariesFinder = StationaryFinder()
     for star in founds["stationaries"]:
         founds["stationaries"][star] = stationariesFinder.find(star)
-        print(".")
 
 #-----------------------------------------------------------------------------
 # Find out planet aspects to sun
 print("Searching for planet aspects...")
 sunAspectFinder = SunAspectFinder()
-for planet in founds["planet_aspects"]:
-    founds["planet_aspects"][planet] = sunAspectFinder.find(planet)
-    print(".")
+founds["planet_aspects"] = sunAspectFinder.findAll(founds["planet_aspects"])
 
 #-----------------------------------------------------------------------------
 # Find out moon apsides
 moonTrack = MoonTrack()
-print("Searching for moon apsides...")
-founds["moon_apsides"] = moonTrack.findApsides()
-print("Searching for moon ecliptic passages...")
-founds["moon_ecliptic_passages"] = moonTrack.findEclipticPassage()
-print("Searching for moon equatorial passages...")
-founds["moon_equatorial_passages"] = moonTrack.findEquatorialPassage()
-print("Searching for moon equatorial farthest...")
-founds["moon_equatorial_farthest"] = moonTrack.findEquatorialFarthest()
+print("Searching for moon apsides, passages and equatorial farthest...")
+(
+    founds["moon_apsides"],
+    founds["moon_ecliptic_passages"],
+    founds["moon_equatorial_passages"],
+    founds["moon_equatorial_farthest"],
+) = moonTrack.findAll()
+
+##############################################################################
+# All found events with their bodies and parameters, cached for other uses,
+# e.g. the store filled by store_calculations.py
+
+bodyNames = {
+    Regulus: "Regulus", Aldebaran: "Aldebaran", Spica: "Spica",
+    Mercury: "Mercury", Venus: "Venus", Mars: "Mars", Jupiter: "Jupiter",
+    Saturn: "Saturn", Uranus: "Uranus", Neptune: "Neptune", Pluto: "Pluto",
+}
+
+def listFounds():
+    for eventType, found in founds.items():
+        bodies = found if isinstance(found, dict) else {None: found}
+        for body, events in bodies.items():
+            for t, data in events:
+                yield t.tt, eventType, bodyNames.get(body, ""), json.dumps(
+                    data, ensure_ascii=False,
+                    default=lambda o: o.item() if hasattr(o, "item") else str(o)
+                )
+
+eventList = list(listFounds())
+saveCached("eventlist", YEAR, {
+    "time": np.array([e[0] for e in eventList], dtype=float),
+    "type": np.array([e[1] for e in eventList], dtype=str),
+    "body": np.array([e[2] for e in eventList], dtype=str),
+    "parameters": np.array([e[3] for e in eventList], dtype=str),
+})
 
 ##############################################################################
 # Sort out events into month and push to table buffer
 tableBuffer = [[], [], [], [], [], [], [], [], [], [], [], []]
+eventTimes, eventTexts = [], [] # for the cache, in the same order
 
 def filterEvents(source, month):
     output = []
@@ -662,6 +797,8 @@ for month in range(1, 13):
 
 
     for ts, utcT, description in monthEvents:
+        eventTimes.append(ts.tt)
+        eventTexts.append(description)
         tableBuffer[month-1].append([ 
             str(utcT.month),# if not monthIsWritten else "")
             #monthIsWritten = True
@@ -693,12 +830,16 @@ def writeTableFoot():
 
 
 
-with open("calculations-cache/events-%d.yaml" % YEAR, "w+") as writer:
-    writer.write(yaml.dump(
-        tableBuffer,
-        allow_unicode=True,
-        default_flow_style=False
-    ))
+saveCached("events", YEAR, {
+    "time": np.array(eventTimes, dtype=float),
+    "text": np.array(eventTexts, dtype=str),
+})
+
+# evaluation budget of each search, for tuning num/epsilon of the finders
+for report in finderReports:
+    print(report)
+with open("calculations-cache/rootfinder-%d.json" % YEAR, "w+") as writer:
+    writer.write(_rootfinder.reports_to_json(finderReports, indent=2))
 
 
 
@@ -718,7 +859,6 @@ with CalculationResults("events", YEAR) as writer:
                     linebuffer = " & " * (SINGLECOLUMN_COLUMNS - 1)
                 line.append(linebuffer)
             if not poped: break
-            print(line)
 
             writer.writeline(" & ".join(line) + " \\tabularnewline")
         
@@ -5,6 +5,7 @@ from skyfield.api import load, Topos
 from skyfield.units import Angle
 from skyfield.earthlib import sidereal_time
 
+from _constants import ephemeris421
 from _calendar import listDates
 from save_calculations import cached, CalculationResults
 
@@ -15,7 +16,7 @@ assert 2000 < YEAR < 3000
 
 
 
-objects = load("de421.bsp")
+objects = ephemeris421
 sun = objects["Sun"]
 earth = objects["Earth"]
 
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+
+# Rise, set and twilight over a year for a list of sites, e.g. the cities of
+# a regional edition:
+#
+#   python3 table_of_sites.py 2020 sites.csv
+#
+# See _sites.loadSites for the list of sites. Writes one row per site and
+# day, in the time zone of the site, to calculations/2020/sites.csv (named
+# after the list):
+#
+#   site, date, sunrise, sunset, civil dawn, civil dusk,
+#   astronomical dawn, astronomical dusk, moonrise, moonset
+#
+# The positions of the sun and the moon are computed once for all sites.
+# Sites are then searched CHUNK at a time, and each chunk is written as soon
+# as it is done, so that memory does not grow with the number of sites.
+
+from _calendar import listDates
+from _constants import Earth, Sun, Moon, timescale
+from _positions import PositionCache
+from _riseset import altitudeOf, findRiseSet
+from _riseset import SUN_LEVELS, MOON_HORIZON, moonLimbCorrection
+from _sites import loadSites, chunksOf
+from save_calculations import CalculationResults
+
+import csv
+import datetime
+import os
+import sys
+import numpy as np
+import pytz
+
+YEAR = int(sys.argv[1])
+assert 2000 < YEAR < 3000
+SITES = sys.argv[2]
+
+CHUNK = 25 # sites
+
+COLUMNS = [
+    "sunrise", "sunset",
+    "civil dawn", "civil dusk",
+    "astronomical dawn", "astronomical dusk",
+    "moonrise", "moonset",
+]
+
+
+# local days of the year begin up to 14 hours before, and end up to 12 hours
+# after the UTC days
+utcStart = timescale.utc(YEAR, 1, 0)
+utcEnd   = timescale.utc(YEAR + 1, 1, 2)
+
+days = [datetime.date(*ymd) for ymd in listDates(YEAR)]
+firstDay = (days[0] - datetime.date(1970, 1, 1)).days
+HHMM = np.array(["%02d:%02d" % divmod(m, 60) for m in range(1440)], dtype=object)
+
+positions = PositionCache(Earth, utcStart, utcEnd)
+searches = [
+    # (altitude, levels, first column)
+    (altitudeOf(positions, Sun), SUN_LEVELS, 0),
+    (altitudeOf(positions, Moon, correction=moonLimbCorrection),
+        [MOON_HORIZON], 6),
+]
+
+
+offsetTables = {}
+
+def utcOffsets(name, seconds):
+    """UTC offsets of time zone name at the given times, all in seconds since
+    1970-01-01 UTC."""
+    if name not in offsetTables:
+        # the offset found at each hour of the searched span, and where it
+        # changes in between, to the second
+        zone = pytz.timezone(name)
+        offset = lambda s: datetime.datetime.fromtimestamp(
+            int(s), zone).utcoffset().total_seconds()
+
+        probes = 86400 * (firstDay + np.arange(-2, len(days) + 3, 1/24))
+        offsets = [offset(s) for s in probes]
+        changes, values = [-np.inf], [offsets[0]]
+        for i in np.flatnonzero(np.diff(offsets)):
+            a, b = probes[i], probes[i+1]
+            while b - a > 1:
+                m = (a + b) // 2
+                a, b = (m, b) if offset(m) == offsets[i] else (a, m)
+            changes.append(b)
+            values.append(offsets[i+1])
+        offsetTables[name] = (np.array(changes), np.array(values))
+
+    changes, values = offsetTables[name]
+    return values[np.searchsorted(changes, seconds, "right") - 1]
+
+
+def unixSeconds(t):
+    """Seconds since 1970-01-01 UTC, rounded as by utc_strftime()."""
+    year, month, day, hour, minute, second = t.utc
+    year, month, day = (np.asarray(e, dtype=np.int64) for e in (year, month, day))
+    date = (
+        (year - 1970).astype("datetime64[Y]").astype("datetime64[M]") +
+        (month - 1)
+    ).astype("datetime64[D]") + (day - 1)
+    return (
+        86400 * date.astype(np.int64) + 3600 * hour + 60 * minute +
+        np.floor(second + 0.5)
+    )
+
+
+def calculateSites(sites):
+    """Returns table[site][day][column] for the sites, with times as HH:MM
+    in the time zone of each site, or "" for no event on that day."""
+    zones = np.array([site.timezone or "UTC" for site in sites])
+    table = np.full((len(sites), len(days), len(COLUMNS)), "", dtype=object)
+
+    for altitude, levels, column in searches:
+        jd, site_i, level_i, direction = findRiseSet(
+            utcStart,
+            utcEnd,
+            altitude,
+            [site.latitude for site in sites],
+            levels,
+            longitudes=[site.longitude for site in sites],
+            elevations=[site.elevation for site in sites],
+        )
+        if len(jd) == 0: continue
+
+        local = unixSeconds(timescale.tt_jd(jd))
+        for zone in set(zones[site_i]):
+            inZone = zones[site_i] == zone
+            local[inZone] += utcOffsets(zone, local[inZone])
+        day, second = np.divmod(local.astype(np.int64), 86400)
+        day -= firstDay
+
+        inYear = (0 <= day) & (day < len(days))
+        columns = column + 2 * level_i + (direction < 0)
+        # in order of time, a later event overwrites an earlier one
+        table[site_i[inYear], day[inYear], columns[inYear]] = \
+            HHMM[second[inYear] // 60]
+    return table
+
+
+sites = loadSites(SITES)
+name = os.path.splitext(os.path.basename(SITES))[0]
+
+with CalculationResults(name, YEAR, "csv") as writer:
+    output = csv.writer(writer.file, lineterminator="\n")
+    output.writerow(["site", "date"] + COLUMNS)
+
+    done = 0
+    for chunk in chunksOf(sites, CHUNK):
+        table = calculateSites(chunk)
+        for site, rows in zip(chunk, table):
+            for day, row in zip(days, rows):
+                output.writerow([site.name, day.isoformat()] + list(row))
+        writer.file.flush()
+
+        done += len(chunk)
+        print("%d of %d sites done." % (done, len(sites)))
@@ -4,7 +4,10 @@ from skyfield.api import load, Topos
 from skyfield.units import Angle
 from skyfield.earthlib import sidereal_time
 
+from _constants import ephemeris421
 from _calendar import listDates
+from _positions import PositionCache
+from _nutation import applyNutation
 
 from save_calculations import CalculationResults
 
@@ -16,11 +19,13 @@ assert 2000 < YEAR < 3000
 
 
 
-objects = load("de421.bsp")
+objects = ephemeris421
 sun = objects["Sun"]
 earth = objects["Earth"]
 
 timescale = load.timescale()
+positions = PositionCache(
+    earth, timescale.utc(YEAR, 1, 1), timescale.utc(YEAR, 12, 31))
 
 
 
@@ -45,12 +50,12 @@ with CalculationResults("sun", YEAR) as writer:
     
     lastMonth = None
     for year, month, day in list(listDates(YEAR))[:]:
-        tdb0 = timescale.tdb(year, month, day, 0, 0, 0)
+        tdb0 = applyNutation(timescale.tdb(year, month, day, 0, 0, 0))
         tt0 = timescale.tt(year, month, day, 0, 0, 0)
         utc0 = timescale.utc(year, month, day, 0, 0, 0)
         ut10 = timescale.ut1(year, month, day, 0, 0, 0)
 
-        astrometric = earth.at(tdb0).observe(sun).apparent()
+        astrometric = positions.apparent(sun, tdb0)
         ra, dec, distance = astrometric.radec(epoch='date')
         ecllat, ecllon, _ = astrometric.ecliptic_latlon(epoch='date')
 
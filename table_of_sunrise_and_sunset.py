@@ -5,12 +5,15 @@ from skyfield import api, almanac
 from skyfield.api import load, Topos
 from skyfield.units import Angle
 from skyfield.earthlib import sidereal_time
-from skyfield.nutationlib import iau2000b
 
+from _calculations import calculateSunRiseSet
 from _calendar import listDates
-from save_calculations import cached, CalculationResults
+from _sites import locations
+from _utils import utcStrftime
+from save_calculations import CalculationResults
 
 import sys
+import numpy as np
 from pytz import timezone
 
 YEAR = int(sys.argv[1])
@@ -18,71 +21,12 @@ assert 2000 < YEAR < 3000
 
 
 
-ephemeris421 = load("de421.bsp")
 timescale = load.timescale()
 BJT = timezone("Asia/Shanghai")
 
 
-def sunrise_sunset(ephemeris , topos, crit=-0.8333):
-    sun = ephemeris['sun']
-    topos_at = (ephemeris['earth'] + topos).at
 
-    def is_sun_up_at(t):
-        """Return `True` if the sun has risen by time `t`."""
-        t._nutation_angles = iau2000b(t.tt)
-        return topos_at(t).observe(sun).apparent().altaz()[0].degrees > crit
-
-    is_sun_up_at.rough_period = 0.5  # twice a day
-    return is_sun_up_at
-
-
-
-
-locations = [
-    (20,        api.Topos('20 N', '0 E')),
-    (30,        api.Topos('30 N', '0 E')),
-    (35,        api.Topos('35 N', '0 E')),
-    (40,        api.Topos('40 N', '0 E')),
-    (45,        api.Topos('45 N', '0 E')),
-    (50,        api.Topos('50 N', '0 E')),
-    (55,        api.Topos('55 N', '0 E')),
-]
-
-
-@cached("sunriseset", YEAR)
-def calculateSunRiseSet(year):
-    utcStart = timescale.utc(year, 1, 1)
-    utcEnd   = timescale.utc(year, 12, 31, 23, 59, 59)
-    founds = {
-        -0.8333: {},
-        -6: {},
-        -18: {},
-    }
-
-    for crit in founds:
-        print("Calculating: sun is below horizont with %f degrees." % -crit)
-
-        for year, month, day in listDates(YEAR):
-            utcStart = timescale.utc(year, month, day, 0, 0, 0)
-            utcEnd = timescale.utc(year, month, day, 23, 59, 59) 
-            
-            if month not in founds[crit]:
-                founds[crit][month] = {}
-            founds[crit][month][day] = {}
-
-            for calcLat, calcTopo in locations:
-                t, y = almanac.find_discrete(
-                    utcStart,
-                    utcEnd, 
-                    sunrise_sunset(ephemeris421, calcTopo, crit)
-                )
-
-                founds[crit][month][day][calcLat] = {'rise': None, 'set': None}
-                for ti, yi in zip(t, y):
-                    founds[crit][month][day][calcLat]["rise" if yi else "set"] =\
-                        ti.utc_strftime("%H:%M")
-    return founds
-founds = calculateSunRiseSet()
+founds = calculateSunRiseSet(YEAR)
 
 
 
@@ -93,6 +37,15 @@ def translateTime(t):
     return t
 
 
+def renderedTimes(crit):
+    # (rise, set) of each day and latitude as HH:MM, for one threshold
+    i = list(founds["levels"]).index(crit)
+    return (
+        utcStrftime(timescale, founds["rise"][i], "%H:%M"),
+        utcStrftime(timescale, founds["set"][i], "%H:%M"),
+    )
+
+
 outputmapping = {
     -0.8333: "sunrise_and_set",
     -6: "civil_twilight",
@@ -101,6 +54,7 @@ outputmapping = {
 
 
 for crit in outputmapping:
+    rises, sets = renderedTimes(crit)
     with CalculationResults(outputmapping[crit], YEAR) as writer:
         
         lastMonth = None
@@ -108,7 +62,7 @@ for crit in outputmapping:
         skipCount = 0
         breakCount = 5
 
-        for year, month, day in list(listDates(YEAR)):
+        for i, (year, month, day) in enumerate(listDates(YEAR)):
 
             if skipCount > 0:
                 skipCount -= 1
@@ -123,7 +77,6 @@ for crit in outputmapping:
                 writer.writeline(" & " * (2*len(locations) + 1) + " \\\\")
 
             line = []
-            result = founds[crit][month][day]
 
             if lastMonth != month:
                 line.append(str(month))
@@ -132,10 +85,9 @@ for crit in outputmapping:
             line.append(str(day))
             lastMonth = month
 
-            for lat, _ in locations:
-                riseset = result[lat]
-                line.append(translateTime(riseset["rise"]))
-                line.append(translateTime(riseset["set"]))
+            for j, _ in enumerate(locations):
+                line.append(translateTime(rises[i][j]))
+                line.append(translateTime(sets[i][j]))
 
 
             writer.writeline(" & ".join(line) + " \\\\")
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+
+# python3 -m pytest test_ephemeris.py
+
+import os
+
+import numpy as np
+import pytest
+from skyfield.api import load
+
+from _ephemeris import StackedEphemeris
+
+
+EPHEMERIS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "de421.bsp")
+
+pytestmark = pytest.mark.skipif(
+    not os.path.exists(EPHEMERIS), reason="de421.bsp not found")
+
+
+def test_apparent_as_skyfield():
+    # against the skyfield installed, whichever way it sums up segments
+    ephemeris = load(EPHEMERIS)
+    earth = ephemeris["Earth"]
+    bodies = [ephemeris[name] for name in ("Moon", "Sun", "Mars")]
+    assert all(StackedEphemeris.supports(body) for body in [earth] + bodies)
+
+    t = load.timescale().utc(2020, 1, np.linspace(1, 366, 50))
+    stacked = StackedEphemeris(earth, bodies)
+    position, velocity, apparent = stacked.observe(t)
+    for b, body in enumerate(bodies):
+        # to 15 m, as newer skyfield splits times into two floats; far below
+        # the deflection and aberration
+        astrometric = earth.at(t).observe(body)
+        assert np.allclose(
+            position[b], astrometric.position.au.T, rtol=0, atol=1e-10)
+        assert np.allclose(
+            velocity[b], astrometric.velocity.au_per_d.T, rtol=0, atol=1e-10)
+        assert np.allclose(
+            apparent[b], astrometric.apparent().position.au.T,
+            rtol=0, atol=1e-10)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+# python3 -m pytest test_rootfinder.py
+
+import types
+
+import numpy as np
+import pytest
+
+from _rootfinder import ChebyshevProxy
+
+
+JD0 = 2459000.5
+
+
+def proxyOf(f, days, piece):
+    proxy = ChebyshevProxy(
+        types.SimpleNamespace(tt=JD0, ts=None),
+        types.SimpleNamespace(tt=JD0 + days, ts=None),
+        piece)
+    return proxy.fit(f(proxy.jd))
+
+
+@pytest.mark.parametrize("days, piece", [(20, 1.0), (21, 1.5), (30, 3.0)])
+def test_roots_and_extrema_on_piece_edges(days, piece):
+    # roots on every fourth edge, extrema on the edges halfway between
+    f = lambda jd: np.sin(np.pi * (jd - JD0) / (2 * piece))
+    proxy = proxyOf(f, days, piece)
+
+    edges = JD0 + piece * np.arange(round(days / piece) + 1)
+    assert np.allclose(proxy.roots(), edges[::2], rtol=0, atol=1e-6)
+    assert np.allclose(proxy.extrema(), edges[1::2], rtol=0, atol=1e-6)
+
+
+@pytest.mark.parametrize("shift", [-1e-10, 0.0, 1e-10])
+def test_roots_near_piece_edges_found_once(shift):
+    f = lambda jd: np.sin(np.pi * (jd - JD0 - shift))
+    proxy = proxyOf(f, 20, 1.0)
+    assert np.allclose(
+        proxy.roots(), JD0 + np.arange(21), rtol=0, atol=1e-6)
+
+
+def test_roots_merged_within_epsilon():
+    # two roots 1e-3 day apart, taken once only when merged
+    f = lambda jd: (jd - JD0 - 5) * (jd - JD0 - 5.001)
+    proxy = proxyOf(f, 10, 2.0)
+    assert len(proxy.roots()) == 2
+    assert len(proxy.roots(merge=1e-2)) == 1
+
+
+def test_no_roots_in_range():
+    # roots of the pieces outside of [-1, 1] only, and none at all
+    proxy = proxyOf(lambda jd: (jd - JD0 + 1) * (jd - JD0 - 11), 10, 2.0)
+    assert len(proxy.roots()) == 0
+    assert len(proxy.extrema()) == 1
+    proxy = proxyOf(lambda jd: np.cos(np.pi * (jd - JD0) / 40) + 2, 10, 2.0)
+    assert len(proxy.roots()) == 0
+    assert len(proxy.extrema(merge=1e-6)) == 1